@@ -3,12 +3,21 @@ Skool Scraper Dashboard - FastAPI Backend
 """
 from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, JSONResponse, FileResponse
+from fastapi.responses import HTMLResponse, JSONResponse, FileResponse, Response
+from starlette.concurrency import run_in_threadpool
+from email.utils import formatdate, parsedate_to_datetime
+import gzip
+import hashlib
 import json
 import os
 import asyncio
 from pathlib import Path
 
+try:
+    import brotli  # optional: pip install brotli
+except ImportError:
+    brotli = None
+
 # Get paths
 BASE_DIR = Path(__file__).parent.parent
 MAP_FILE = BASE_DIR / "map.json"
@@ -20,16 +29,88 @@ SETTINGS_FILE = BASE_DIR / "config" / "settings.json"
 
 app = FastAPI(title="Skool Scraper v1.1 by oggi")
 
+# --- Conditional, compressed responses ---
+# Bodies are cached per name together with the ETag they were built for, one
+# entry per content encoding, so an unchanged map is read and compressed once.
+COMPRESS_MIN_BYTES = 1024
+COMPRESSIBLE = ("application/json", "application/javascript", "text/", "image/svg+xml")
+_bodies: dict[str, tuple[str, dict[str, bytes]]] = {}
+
+def pick_encoding(accept_encoding):
+    offered = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try: q = float(params.strip()[2:])
+            except ValueError: q = 0.0
+        offered[name.strip()] = q
+    for name in (("br",) if brotli else ()) + ("gzip",):
+        if offered.get(name, offered.get("*", 0)) > 0: return name
+    return "identity"
+
+def compress(body, encoding):
+    if encoding == "br": return brotli.compress(body, quality=5)
+    if encoding == "gzip": return gzip.compress(body, compresslevel=6)
+    return body
+
+def validators(name, sources):
+    """Weak ETag and Last-Modified from the mtime/size of the files a response is built from"""
+    stats = [p.stat() for p in sources if p.exists()]
+    tag = hashlib.sha1(f"{name}:{[(s.st_mtime_ns, s.st_size) for s in stats]}".encode()).hexdigest()[:20]
+    return f'W/"{tag}"', max((s.st_mtime for s in stats), default=0)
+
+def not_modified(request, etag, mtime):
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return if_none_match.strip() == "*" or etag in [t.strip() for t in if_none_match.split(",")]
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and mtime:
+        try: return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError): return False
+    return False
+
+async def cached_response(request, name, sources, build, media_type):
+    """304 when the client's copy is current, else the (compressed) body from build()"""
+    etag, mtime = validators(name, sources)
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if mtime: headers["Last-Modified"] = formatdate(mtime, usegmt=True)
+    if not_modified(request, etag, mtime):
+        return Response(status_code=304, headers=headers)
+
+    cached = _bodies.get(name)
+    if not cached or cached[0] != etag:
+        cached = _bodies[name] = (etag, {"identity": await run_in_threadpool(build)})
+    bodies = cached[1]
+    encoding = "identity"
+    if len(bodies["identity"]) >= COMPRESS_MIN_BYTES and media_type.startswith(COMPRESSIBLE):
+        encoding = pick_encoding(request.headers.get("accept-encoding", ""))
+    if encoding not in bodies:
+        bodies[encoding] = await run_in_threadpool(compress, bodies["identity"], encoding)
+    if encoding != "identity": headers["Content-Encoding"] = encoding
+    return Response(bodies[encoding], media_type=media_type, headers=headers)
+
+class CachedStaticFiles(StaticFiles):
+    """StaticFiles with compression and revalidation on every load"""
+    async def get_response(self, path, scope):
+        response = await super().get_response(path, scope)
+        if response.status_code != 200 or not isinstance(response, FileResponse):
+            return response
+        file_path = Path(response.path)
+        return await cached_response(Request(scope), f"static:{file_path}", [file_path],
+                                     file_path.read_bytes, response.media_type)
+
 # Serve static files
-app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
+app.mount("/static", CachedStaticFiles(directory=STATIC_DIR), name="static")
 
 # WebSocket connections for real-time updates
 active_connections: list[WebSocket] = []
 
 @app.get("/", response_class=HTMLResponse)
-async def home():
+async def home(request: Request):
     """Serve the main dashboard page"""
-    return FileResponse(STATIC_DIR / "index.html")
+    index = STATIC_DIR / "index.html"
+    return await cached_response(request, "index", [index], index.read_bytes, "text/html; charset=utf-8")
 
 def get_settings():
     if SETTINGS_FILE.exists():
@@ -70,18 +151,20 @@ async def pick_folder():
     return {"folder": None}
 
 @app.get("/api/map")
-async def get_map():
+async def get_map(request: Request):
     """Return the scraped course map"""
     if not MAP_FILE.exists():
         return JSONResponse({"error": "No map found. Run the mapper first."}, status_code=404)
-    
-    with open(MAP_FILE, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    return data
+    # map.json is already JSON: serve its bytes instead of parsing and re-encoding
+    return await cached_response(request, "map", [MAP_FILE], MAP_FILE.read_bytes, "application/json")
 
 @app.get("/api/stats")
-async def get_stats():
+async def get_stats(request: Request):
     """Return statistics about the scraped content"""
+    build = lambda: json.dumps(compute_stats()).encode("utf-8")
+    return await cached_response(request, "stats", [MAP_FILE, SETTINGS_FILE], build, "application/json")
+
+def compute_stats():
     # Check if we have settings
     settings = get_settings()
     
@@ -152,13 +235,23 @@ async def get_stats():
 
 from fastapi.responses import StreamingResponse
 
+def filter_args(options):
+    """CLI args for the include/exclude filters sent as {"include": [...], "exclude": [...]}"""
+    args = []
+    for key in ("include", "exclude"):
+        values = (options or {}).get(key) or []
+        if isinstance(values, str): values = [values]
+        for v in values:
+            if str(v).strip(): args += [f"--{key}", str(v).strip()]
+    return args
+
 @app.post("/api/scrape")
-async def start_scrape():
+async def start_scrape(options: dict | None = None):
     """Trigger a new scrape with streaming output"""
     import subprocess
     def generate():
         process = subprocess.Popen(
-            ["python", "tools/mapper.py"],
+            ["python", "tools/mapper.py", *filter_args(options)],
             cwd=BASE_DIR,
             stdout=subprocess.PIPE,
             stderr=subprocess.STDOUT,
@@ -173,12 +266,12 @@ async def start_scrape():
     return StreamingResponse(generate(), media_type="text/plain")
 
 @app.post("/api/download")
-async def start_download():
+async def start_download(options: dict | None = None):
     """Trigger download with streaming output"""
     import subprocess
     def generate():
         process = subprocess.Popen(
-            ["python", "tools/downloader.py"],
+            ["python", "tools/downloader.py", *filter_args(options)],
             cwd=BASE_DIR,
             stdout=subprocess.PIPE,
             stderr=subprocess.STDOUT,
@@ -90,15 +90,21 @@ class Dashboard {
         pre.textContent = `🚀 Initializing ${type === 'scrape' ? 'Mapper' : 'Downloader'}...\n`;
 
         try {
-            const response = await fetch(`/api/${type}`, { method: 'POST' });
+            const response = await fetch(`/api/${type}`, {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify(this.readFilters(type === 'scrape' ? 'scrape-filter' : 'download-filter'))
+            });
             const reader = response.body.getReader();
             const decoder = new TextDecoder();
 
             while (true) {
                 const { value, done } = await reader.read();
                 if (done) break;
-                pre.textContent += decoder.decode(value, { stream: true });
+                const chunk = decoder.decode(value, { stream: true });
+                pre.textContent += chunk;
                 pre.scrollTop = pre.scrollHeight;
+                this.trackAuth(chunk);
             }
 
             pre.textContent += `\n✅ ${type.toUpperCase()} COMPLETE!`;
@@ -108,6 +114,24 @@ class Dashboard {
         btn.disabled = false;
     }
 
+    trackAuth(chunk) {
+        const status = document.getElementById('global-status');
+        if (chunk.includes('[AUTH] PAUSED')) status.textContent = 'Paused: cookies expired - update cookies.json';
+        else if (chunk.includes('[AUTH] RESUMED')) status.textContent = 'Running';
+        else if (chunk.includes('[AUTH] ABORTED')) status.textContent = 'Stopped: cookies expired';
+    }
+
+    // "course-slug, Intro*, !module-id" -> { include: [...], exclude: [...] }
+    readFilters(inputId) {
+        const filters = { include: [], exclude: [] };
+        const value = document.getElementById(inputId)?.value || '';
+        value.split(',').map(p => p.trim()).filter(Boolean).forEach(p => {
+            if (p.startsWith('!')) filters.exclude.push(p.slice(1).trim());
+            else filters.include.push(p);
+        });
+        return filters;
+    }
+
     async pickFolder() {
         try {
             const resp = await fetch('/api/pick-folder');
@@ -160,8 +184,12 @@ class Dashboard {
 
     async loadMapData() {
         try {
-            const resp = await fetch('/api/map');
+            // Revalidate by hand so an unchanged map is neither re-sent nor re-parsed
+            const headers = this.mapEtag ? { 'If-None-Match': this.mapEtag } : {};
+            const resp = await fetch('/api/map', { headers, cache: 'no-store' });
+            if (resp.status === 304) return;
             if (resp.ok) {
+                this.mapEtag = resp.headers.get('ETag');
                 this.mapData = await resp.json();
                 this.updateLogic();
             }
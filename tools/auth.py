@@ -0,0 +1,161 @@
+"""
+Session health monitor shared by the mapper and downloader workers.
+
+When Skool starts answering 401/403 or redirecting to the login page, the
+session cookies may have expired, in which case every further request is
+wasted. A single refusal can also just be a locked file, so the monitor first
+confirms the session is dead (re-requesting the classroom, or failing that,
+waiting for refusals on several distinct URLs). Only then does it pause all
+workers, announce it, and wait for cookies.json to change on disk. Once it does, reload callbacks run (new session cookies,
+regenerated cookies_netscape.txt) and the workers continue where they were.
+"""
+import json
+import sys
+import threading
+import time
+from urllib.parse import urlparse
+
+AUTH_STATUSES = (401, 403)
+
+class SessionExpired(Exception):
+    """Raised when the run is aborted because cookies were never refreshed"""
+
+def flush_print(msg):
+    msg = msg.encode('ascii', 'ignore').decode('ascii')
+    print(msg)
+    sys.stdout.flush()
+
+def classroom_url(target_url):
+    base = (target_url or "").rstrip('/')
+    return base if "/classroom" in base.lower() else base + "/classroom"
+
+class AuthMonitor:
+    def __init__(self, cookies_file, target_url=None, poll_interval=5, timeout=3600, check=None, min_failures=3,
+                 loaded_mtime=None):
+        """check: fn(url) -> (status, final_url) fetching a page that needs a login with
+        the current cookies. Without it (or when it errors), the session only counts as
+        expired after `min_failures` distinct URLs were refused.
+
+        loaded_mtime: cookies.json mtime when the caller read the cookies in use
+        (default: now). Any later save counts as fresh cookies, even one made
+        before the session is found expired."""
+        self.cookies_file = cookies_file
+        self.loaded_mtime = loaded_mtime if loaded_mtime is not None else self._mtime()
+        self.hosts = {"skool.com"}
+        if target_url:
+            self.hosts.add((urlparse(target_url).hostname or "").lower())
+        self.check_url = classroom_url(target_url) if target_url else None
+        self.check = check
+        self.min_failures = min_failures
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.aborted = False
+        self.generation = 0  # bumped on every cookie reload
+        self._ok = threading.Event()
+        self._ok.set()
+        self._lock = threading.Lock()
+        self._check_lock = threading.Lock()
+        self._refused = {}  # url -> generation of its latest refusal
+        self._reloaders = []
+        self._listeners = []
+
+    def on_reload(self, fn):
+        """fn() runs once, on the watcher thread, each time new cookies appear"""
+        self._reloaders.append(fn)
+
+    def add_listener(self, fn):
+        """fn(event, detail) for 'paused', 'resumed' and 'aborted'"""
+        self._listeners.append(fn)
+
+    def emit(self, event, detail=""):
+        flush_print(f"[AUTH] {event.upper()}: {detail}")
+        for fn in self._listeners:
+            try: fn(event, detail)
+            except Exception: pass
+
+    def _ours(self, url):
+        host = (urlparse(url or "").hostname or "").lower()
+        return any(host == h or host.endswith("." + h) for h in self.hosts if h)
+
+    def is_auth_failure(self, url, status, final_url=None):
+        if not self._ours(url): return False
+        if status in AUTH_STATUSES: return True
+        return bool(final_url) and self._ours(final_url) and urlparse(final_url).path.rstrip('/').endswith('/login')
+
+    def report(self, url, status, final_url=None, generation=None):
+        """Check a response; returns True if the caller should wait() and retry.
+
+        That is the case when the session is confirmed expired (everyone is
+        paused) or when the request was sent before the last cookie reload
+        (generation: value of self.generation at send time). False for a refusal
+        of this URL alone, which the caller handles as a normal failure.
+        """
+        if not self.is_auth_failure(url, status, final_url): return False
+        if generation is not None and generation != self.generation: return True
+        if not self.session_expired(url): return False
+        self.trip(f"{status} from {urlparse(url).path or url}")
+        return True
+
+    def session_expired(self, url):
+        """Tell an expired session apart from one forbidden URL"""
+        with self._check_lock:
+            if self.paused: return True
+            previous = self._refused.get(url)
+            self._refused[url] = self.generation
+            if previous is not None and previous == self.generation - 1:
+                return False  # refused again right after fresh cookies: the file itself is off limits
+            if self.check and self.check_url:
+                try:
+                    status, final_url = self.check(self.check_url)
+                    if self.is_auth_failure(self.check_url, status, final_url): return True
+                    if status and status < 400: return False
+                except Exception:
+                    pass  # inconclusive: fall back to counting refusals
+            refused = sum(1 for g in self._refused.values() if g == self.generation)
+            return refused >= self.min_failures
+
+    def trip(self, reason):
+        with self._lock:
+            if not self._ok.is_set() or self.aborted: return
+            self._ok.clear()
+        self.emit("paused", f"session expired ({reason}). Export fresh cookies into {self.cookies_file} to resume.")
+        threading.Thread(target=self._watch, daemon=True).start()
+
+    def wait(self):
+        """Block while paused. False means the run was aborted and the caller should stop."""
+        self._ok.wait()
+        return not self.aborted
+
+    @property
+    def paused(self):
+        return not self._ok.is_set()
+
+    def _mtime(self):
+        try: return self.cookies_file.stat().st_mtime
+        except OSError: return None
+
+    def _watch(self):
+        deadline = time.monotonic() + self.timeout
+        first = True
+        while time.monotonic() < deadline:
+            # Cookies saved since they were last loaded are picked up straight away
+            if not first: time.sleep(self.poll_interval)
+            first = False
+            mtime = self._mtime()
+            if mtime is None or mtime == self.loaded_mtime: continue
+            try:
+                # A half-written file (editor still saving) is not a reload yet
+                with open(self.cookies_file, "r", encoding="utf-8") as f: json.load(f)
+            except Exception:
+                continue
+            for fn in self._reloaders:
+                try: fn()
+                except Exception as e: flush_print(f"   [WARN] Cookie reload step failed: {e}")
+            self.loaded_mtime = mtime
+            self.generation += 1
+            self.emit("resumed", "new cookies loaded.")
+            self._ok.set()
+            return
+        self.aborted = True
+        self.emit("aborted", f"no new cookies after {self.timeout // 60} minutes.")
+        self._ok.set()
@@ -0,0 +1,208 @@
+"""
+Offline benchmark for mapper() and downloader() against the fake Skool server.
+
+Each run happens in a fresh temporary workspace, so results only depend on the
+size/latency/error settings and the seed. Results are written as JSON so runs
+from different versions can be compared with --compare.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from fake_skool import FakeSkool
+
+ROOT = Path(__file__).parent.parent
+RESULTS_DIR = ROOT / "benchmarks"
+
+class StageFailed(Exception):
+    """A stage produced nothing; mapper()/downloader() report their own errors instead of raising"""
+
+def git_revision():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True)
+        return out.stdout.strip() or "unknown"
+    except Exception:
+        return "unknown"
+
+def count_files(folder):
+    files, size = 0, 0
+    for root, _, names in os.walk(folder):
+        for n in names:
+            files += 1
+            size += os.path.getsize(os.path.join(root, n))
+    return files, size
+
+def count_modules(map_file):
+    if not map_file.exists(): return 0
+    with open(map_file, "r", encoding="utf-8") as f: data = json.load(f)
+    def walk(nodes):
+        return sum(1 if n.get("unitType") == "module" else walk(n.get("children", [])) for n in nodes)
+    return sum(walk(c.get("details", {}).get("hierarchy", [])) for c in data.get("courses", []))
+
+def timed(fn, log, quiet):
+    """Run fn, returning elapsed seconds. Output goes to log when quiet."""
+    start = time.perf_counter()
+    if quiet:
+        with contextlib.redirect_stdout(log): fn()
+    else:
+        fn()
+    return time.perf_counter() - start
+
+def run_benchmark(args):
+    fake = FakeSkool(courses=args.courses, modules=args.modules, assets=args.assets,
+                     asset_size=args.asset_kb * 1024, video_size=args.video_kb * 1024,
+                     video_ratio=args.video_ratio, latency_ms=args.latency_ms,
+                     error_rate=args.error_rate, seed=args.seed, expire_after=args.expire_after)
+    results = {
+        "label": args.label or git_revision(),
+        "revision": git_revision(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": {k: v for k, v in vars(args).items() if k not in ("output", "compare", "label", "verbose")},
+        "results": {},
+    }
+    log = io.StringIO()
+    cwd = os.getcwd()
+    with fake, tempfile.TemporaryDirectory(prefix="skool-bench-") as work:
+        work = Path(work)
+        os.chdir(work)
+        try:
+            config = {"target_url": fake.target_url, "output_dir": str(work / "downloads"), "delay_scale": args.delay_scale}
+            (work / "config").mkdir()
+            with open(work / "config" / "settings.json", "w") as f: json.dump(config, f, indent=4)
+            if args.expire_after is not None:
+                write_cookies(work, fake)
+                threading.Thread(target=renew_session, args=(work, fake, args.renew_after), daemon=True).start()
+
+            if "mapper" in args.only:
+                from mapper import mapper
+                print(f"[BENCH] mapper: {fake.module_count} modules at {fake.target_url}")
+                before = dict(fake.stats, routes=dict(fake.stats["routes"]))
+                secs = timed(lambda: mapper(config), log, not args.verbose)
+                mapped = count_modules(work / "map.json")
+                if not mapped:
+                    raise StageFailed("mapper wrote no modules to map.json", log.getvalue())
+                results["results"]["mapper"] = {
+                    "seconds": round(secs, 3),
+                    "modules": mapped,
+                    "modules_per_sec": round(mapped / secs, 3) if secs else None,
+                    "requests": fake.stats["requests"] - before["requests"],
+                }
+            else:
+                # Downloader-only runs need a map; build it straight from the fake data
+                with open(work / "map.json", "w", encoding="utf-8") as f: json.dump(synthetic_map(fake), f)
+
+            if "downloader" in args.only:
+                from downloader import downloader
+                print("[BENCH] downloader")
+                before = dict(fake.stats)
+                secs = timed(lambda: downloader(config), log, not args.verbose)
+                files, size = count_files(work / "downloads")
+                if not files:
+                    raise StageFailed("downloader saved no files", log.getvalue())
+                results["results"]["downloader"] = {
+                    "seconds": round(secs, 3),
+                    "files": files,
+                    "bytes": size,
+                    "mb_per_sec": round(size / 1048576 / secs, 3) if secs else None,
+                    "requests": fake.stats["requests"] - before["requests"],
+                    "bytes_served": fake.stats["bytes"] - before["bytes"],
+                }
+        finally:
+            os.chdir(cwd)
+        results["results"]["server"] = dict(fake.stats)
+    results["log_lines"] = len(log.getvalue().splitlines())
+    return results
+
+def write_cookies(work, fake):
+    with open(work / "cookies.json", "w", encoding="utf-8") as f:
+        json.dump([{"domain": fake.host, "name": "auth_token", "value": fake.token, "path": "/"}], f)
+
+def renew_session(work, fake, delay):
+    """Play the user: once the fake session expires, export fresh cookies after `delay` seconds"""
+    while not fake.expired: time.sleep(0.2)
+    time.sleep(delay)
+    fake.renew()
+    write_cookies(work, fake)
+
+def synthetic_map(fake):
+    """map.json equivalent of what mapper() would produce for the fake community"""
+    courses = []
+    for c in fake.community:
+        hierarchy = []
+        for s in c["sets"]:
+            children = []
+            for m in s["modules"]:
+                meta = {"title": m["title"], "desc": fake._desc(m),
+                        "resource_links": [{"name": a["name"], "url": fake.url(a["path"])} for a in m["assets"]]
+                                          + [{"name": "Further reading", "url": fake.url(m["page"])}]}
+                if m["video"]: meta["videoLink"] = fake.url(m["video"])
+                children.append({"id": m["id"], "title": m["title"], "unitType": "module", "children": [], "metadata": meta})
+            hierarchy.append({"id": s["id"], "title": s["title"], "unitType": "set", "children": children, "metadata": {}})
+        courses.append({"title": c["title"], "details": {"hierarchy": hierarchy}})
+    return {"courses": courses}
+
+def compare(old, new):
+    print(f"\n[COMPARE] {old.get('label')} -> {new.get('label')}")
+    if old.get("params") != new.get("params"):
+        print("   [WARN] Parameters differ; numbers are not directly comparable.")
+    for stage in ("mapper", "downloader"):
+        a, b = old["results"].get(stage), new["results"].get(stage)
+        if not a or not b: continue
+        change = (b["seconds"] - a["seconds"]) / a["seconds"] * 100 if a["seconds"] else 0
+        print(f"   {stage:<11} {a['seconds']:>9.3f}s -> {b['seconds']:>9.3f}s ({change:+.1f}%)")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark mapper/downloader against a local fake Skool server")
+    parser.add_argument("--courses", type=int, default=3)
+    parser.add_argument("--modules", type=int, default=10, help="modules per course")
+    parser.add_argument("--assets", type=int, default=2, help="asset files per module")
+    parser.add_argument("--asset-kb", type=int, default=256)
+    parser.add_argument("--video-kb", type=int, default=1024)
+    parser.add_argument("--video-ratio", type=float, default=0.5, help="fraction of modules with a video")
+    parser.add_argument("--latency-ms", type=int, default=0, help="added latency per request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of URLs whose first request fails")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--expire-after", type=int, help="expire the session after N authenticated requests (downloader only)")
+    parser.add_argument("--renew-after", type=float, default=5.0, help="seconds until fresh cookies are written after expiry")
+    parser.add_argument("--delay-scale", type=float, default=0.0, help="scale for mapper page settle delays")
+    parser.add_argument("--only", nargs="+", choices=["mapper", "downloader"], default=["mapper", "downloader"])
+    parser.add_argument("--label", help="name for this run (default: git revision)")
+    parser.add_argument("--output", help="results file (default: benchmarks/<label>.json)")
+    parser.add_argument("--compare", help="previous results file to compare against")
+    parser.add_argument("--verbose", action="store_true", help="show mapper/downloader output")
+    args = parser.parse_args(argv)
+    if args.expire_after is not None and "mapper" in args.only:
+        parser.error("--expire-after needs --only downloader (the mapper reads cookies from the project root)")
+
+    try:
+        results = run_benchmark(args)
+    except StageFailed as e:
+        reason, output = e.args
+        tail = "\n".join(output.splitlines()[-15:])
+        if tail: print(tail)
+        print(f"[FAIL] {reason}; no results written.")
+        return 1
+    out = Path(args.output) if args.output else RESULTS_DIR / f"{results['label']}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f: json.dump(results, f, indent=2)
+    for stage, r in results["results"].items():
+        if stage != "server": print(f"   [{stage.upper()}] {r}")
+    print(f"[FINISH] Results saved to {out}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f: compare(json.load(f), results)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+"""
+Offline checks for the cloud link fetchers in providers.py.
+
+Responses recorded from Google Drive, Google Docs and Dropbox (trimmed to the
+parts the fetchers read) live in fixtures/providers/responses.json. They are
+replayed by a local HTTP server; a transport adapter sends every https request
+there with the original host in a header, so the providers run unchanged.
+
+    python tools/check_providers.py
+"""
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler
+from pathlib import Path
+from urllib.parse import urlparse, parse_qs
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from fake_skool import _QuietServer
+from providers import GoogleDrive, GoogleDocs, Dropbox, Notion
+
+FIXTURES = Path(__file__).parent / "fixtures" / "providers"
+
+def load_fixtures():
+    with open(FIXTURES / "responses.json", "r", encoding="utf-8") as f: entries = json.load(f)
+    for e in entries:
+        body = (FIXTURES / e["body_file"]).read_text(encoding="utf-8") if "body_file" in e else e.get("body", "")
+        e["data"] = body.encode("utf-8")
+    return entries
+
+class FixtureServer:
+    """Replays the first recorded response whose host, path and query (subset) match"""
+
+    def __init__(self, entries):
+        self.entries = entries
+        fixtures = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args): pass
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                host = self.headers.get("X-Fixture-Host", "")
+                query = {k: v[0] for k, v in parse_qs(url.query).items()}
+                entry = next((e for e in fixtures.entries if e["host"] == host and e["path"] == url.path
+                              and all(query.get(k) == v for k, v in e["query"].items())), None)
+                if entry is None:
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                self.send_response(entry["status"])
+                for k, v in entry["headers"].items(): self.send_header(k, v)
+                self.send_header("Content-Length", str(len(entry["data"])))
+                self.end_headers()
+                self.wfile.write(entry["data"])
+
+        self.httpd = _QuietServer(("127.0.0.1", 0), Handler)
+        self.base = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def __enter__(self):
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+class FixtureAdapter(HTTPAdapter):
+    def __init__(self, base):
+        super().__init__()
+        self.base = base
+
+    def send(self, request, **kwargs):
+        url = urlparse(request.url)
+        request.headers["X-Fixture-Host"] = url.hostname
+        request.url = f"{self.base}{url.path}" + (f"?{url.query}" if url.query else "")
+        return super().send(request, **kwargs)
+
+def fixture_session(server):
+    session = requests.Session()
+    session.mount("https://", FixtureAdapter(server.base))
+    return session
+
+def fetch(provider, url, server):
+    r = provider.open(url, fixture_session(server), timeout=5)
+    try: return r.headers.get("Content-Type"), r.content
+    finally: r.close()
+
+def raises(fn, exc=ValueError):
+    try: fn()
+    except exc: return True
+    return False
+
+def checks(server):
+    """(description, check) pairs; a check returns True when the fetcher behaves"""
+    drive, docs, dropbox, notion = GoogleDrive(0), GoogleDocs(0), Dropbox(0), Notion(0)
+    return [
+        ("GoogleDrive.open follows the download-form confirm page",
+         lambda: fetch(drive, "https://drive.google.com/file/d/1FORMxFixtureId/view?usp=sharing", server) == ("video/mp4", b"....ftypisom fixture video")),
+        ("GoogleDrive.open retries with the download_warning cookie token",
+         lambda: fetch(drive, "https://drive.google.com/open?id=1COOKIExFixtureId", server)[1].startswith(b"%PDF")),
+        ("GoogleDrive.open rejects a sign-in page",
+         lambda: raises(lambda: fetch(drive, "https://drive.google.com/file/d/1PRIVATExFixtureId/view", server))),
+        ("GoogleDrive.resolve leaves folders as links",
+         lambda: drive.resolve("https://drive.google.com/drive/folders/1AbCdEf") is None),
+        ("GoogleDocs.resolve exports documents as PDF",
+         lambda: docs.resolve("https://docs.google.com/document/d/1PUBLICxDoc/edit?usp=sharing") == ("https://docs.google.com/document/d/1PUBLICxDoc/export?format=pdf", ".pdf")),
+        ("GoogleDocs.resolve exports sheets as XLSX",
+         lambda: docs.resolve("https://docs.google.com/spreadsheets/d/1Sheet_x/edit#gid=0") == ("https://docs.google.com/spreadsheets/d/1Sheet_x/export?format=xlsx", ".xlsx")),
+        ("GoogleDocs.resolve exports slides as PDF",
+         lambda: docs.resolve("https://docs.google.com/presentation/d/1Deck-x/edit") == ("https://docs.google.com/presentation/d/1Deck-x/export?format=pdf", ".pdf")),
+        ("GoogleDocs.resolve leaves forms as links",
+         lambda: docs.resolve("https://docs.google.com/forms/d/e/1FAIpQLSe/viewform") is None),
+        ("GoogleDocs.open downloads a public export",
+         lambda: fetch(docs, "https://docs.google.com/document/d/1PUBLICxDoc/edit", server)[0] == "application/pdf"),
+        ("GoogleDocs.open rejects the sign-in page of a private export",
+         lambda: raises(lambda: fetch(docs, "https://docs.google.com/document/d/1PRIVATExDoc/edit", server))),
+        ("Dropbox.resolve forces dl=1 and drops raw",
+         lambda: dropbox.resolve("https://dropbox.com/s/abc123/Slides.pdf?dl=0&raw=1") == ("https://www.dropbox.com/s/abc123/Slides.pdf?dl=1", ".pdf")),
+        ("Dropbox.resolve keeps rlkey and names folder links .zip",
+         lambda: dropbox.resolve("https://www.dropbox.com/scl/fo/xyz/h?rlkey=k1&dl=0") == ("https://www.dropbox.com/scl/fo/xyz/h?rlkey=k1&dl=1", ".zip")),
+        ("Dropbox.open downloads a shared file",
+         lambda: fetch(dropbox, "https://www.dropbox.com/s/abc123/Slides.pdf?dl=0", server)[1].startswith(b"%PDF")),
+        ("Dropbox.open rejects the error page of a dead link",
+         lambda: raises(lambda: fetch(dropbox, "https://www.dropbox.com/s/gone999/Removed.pdf?dl=0", server))),
+        ("Notion.resolve fetches file attachments directly",
+         lambda: notion.resolve("https://file.notion.so/f/s/abc/Worksheet.pdf") == ("https://file.notion.so/f/s/abc/Worksheet.pdf", ".pdf")),
+        ("Notion.resolve leaves pages as links",
+         lambda: notion.resolve("https://acme.notion.site/Course-Notes-0123456789abcdef") is None),
+    ]
+
+def main():
+    failed = 0
+    with FixtureServer(load_fixtures()) as server:
+        for name, check in checks(server):
+            try: ok, detail = bool(check()), ""
+            except Exception as e: ok, detail = False, f" ({e})"
+            print(f"   [{'OK' if ok else 'FAIL'}] {name}{detail}")
+            failed += not ok
+    print(f"[FINISH] {failed} failed." if failed else "[FINISH] All provider checks passed.")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,21 @@
+import glob
+import hashlib
 import json
 import os
 import time
 import requests
 import re
+import shutil
 import subprocess
 import sys
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from prober import load_probe_cache, save_probe_cache, probe_resources, probe_url, guess_from_url, resource_filename, disposition_filename, has_extension
+from providers import load_providers, find_provider
+from selection import Selection, add_filter_args
+from auth import AuthMonitor
+from manifest import Manifest, sha256_file
+from maptree import DIFF_FILE, changed_patterns, load_map, summarize
 
 def flush_print(msg):
     msg = msg.encode('ascii', 'ignore').decode('ascii')
@@ -16,6 +26,9 @@ MAP_FILE = Path("map.json")
 COOKIES_FILE = Path("cookies.json")
 COOKIES_NETSCAPE = Path("cookies_netscape.txt")
 SETTINGS_FILE = Path("config/settings.json")
+VIDEO_FORMAT = "bestvideo[ext=mp4]+bestaudio[ext=m4a]/best"
+VIDEO_EXTS = ['.mp4', '.mkv', '.webm']
+PRIORITIES = ["course", "smallest", "files-first"]
 
 def save_cookies_netscape(json_path, netscape_path):
     """Convert Playwright JSON cookies to Netscape format for yt-dlp"""
@@ -53,42 +66,104 @@ def get_config():
 
 def get_requests_session():
     session = requests.Session()
-    if COOKIES_FILE.exists():
-        try:
-            with open(COOKIES_FILE, "r", encoding="utf-8") as f:
-                cookies = json.load(f)
-                for cookie in cookies:
-                    session.cookies.set(cookie['name'], cookie['value'], domain=cookie.get('domain', ''))
-            flush_print("   [SESSION] Cookies loaded for downloads.")
-        except Exception as e:
-            flush_print(f"   [WARN] Failed to load session cookies: {e}")
+    # Room for the concurrent probe workers
+    adapter = requests.adapters.HTTPAdapter(pool_connections=16, pool_maxsize=16)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    load_session_cookies(session)
     return session
 
+def load_session_cookies(session):
+    if not COOKIES_FILE.exists(): return
+    try:
+        with open(COOKIES_FILE, "r", encoding="utf-8") as f:
+            cookies = json.load(f)
+        session.cookies.clear()
+        for cookie in cookies:
+            session.cookies.set(cookie['name'], cookie['value'], domain=cookie.get('domain', ''))
+        flush_print("   [SESSION] Cookies loaded for downloads.")
+    except Exception as e:
+        flush_print(f"   [WARN] Failed to load session cookies: {e}")
+
+def sync_cookies_netscape():
+    """Regenerate cookies_netscape.txt only when cookies.json is newer than it"""
+    if not COOKIES_FILE.exists(): return False
+    if COOKIES_NETSCAPE.exists() and COOKIES_NETSCAPE.stat().st_mtime >= COOKIES_FILE.stat().st_mtime: return True
+    return save_cookies_netscape(COOKIES_FILE, COOKIES_NETSCAPE)
+
+def session_status(session, url):
+    """(status, final URL) of a page that needs a login, for AuthMonitor's session check"""
+    r = session.get(url, timeout=15, allow_redirects=True, stream=True)
+    r.close()
+    return r.status_code, r.url
+
 def sanitize_filename(name):
     # Remove emojis and illegal chars
     clean = re.sub(r'[^\x00-\x7F]+', '', str(name))
     clean = re.sub(r'[<>:"/\\|?*]', '', clean).strip()
     return clean[:100]
 
-def download_file(url, folder, filename, session=None, retries=3):
-    path = folder / sanitize_filename(filename)
+def file_exists(path):
     if path.exists(): return True
+    # Extension only known from the response (e.g. Drive files): any earlier download counts
+    # (an interrupted .part transfer does not count)
+    return not has_extension(path.name) and any(p.suffix != ".part" for p in path.parent.glob(glob.escape(path.name) + ".*"))
+
+def video_exists(output_path):
+    # Support multiple extensions for existing file check
+    return any(os.path.exists(str(output_path) + ext) for ext in VIDEO_EXTS)
+
+def download_file(url, folder, filename, session=None, retries=3, provider=None, monitor=None, manifest=None):
+    path = folder / sanitize_filename(filename)
+    if file_exists(path): return True
     
-    for attempt in range(retries):
+    attempt = 0
+    while attempt < retries:
         try:
             flush_print(f"      [FILE] Downloading (Attempt {attempt+1}/{retries}): {filename}...")
             caller = session if session else requests
-            r = caller.get(url, stream=True, timeout=30)
+            generation = monitor.generation if monitor else None
+            if provider:
+                r = provider.open(url, caller, timeout=30)
+            else:
+                r = caller.get(url, stream=True, timeout=30)
+            if monitor and monitor.is_auth_failure(url, r.status_code, r.url):
+                r.close()
+                if monitor.report(url, r.status_code, r.url, generation):
+                    # Expired session: wait for new cookies without spending a retry
+                    if not monitor.wait(): return False
+                    continue
+                raise IOError(f"access denied ({r.status_code})")  # just this file
             r.raise_for_status()
-            with open(path, 'wb') as f:
+            if not has_extension(path.name):
+                info = {"filename": disposition_filename(r.headers.get("Content-Disposition")), "content_type": r.headers.get("Content-Type"), "final_url": r.url}
+                path = folder / sanitize_filename(resource_filename(path.name, url, info))
+                if path.exists():
+                    r.close()
+                    return True
+            # Stream to .part so an interrupted transfer never looks like a finished file
+            part = path.with_name(path.name + ".part")
+            digest, size = hashlib.sha256(), 0
+            with open(part, 'wb') as f:
                 for chunk in r.iter_content(chunk_size=8192):
                     f.write(chunk)
+                    digest.update(chunk)
+                    size += len(chunk)
+            expected = r.headers.get("Content-Length")
+            expected = int(expected) if expected and not r.headers.get("Content-Encoding") else None
+            if expected is not None and size != expected:
+                raise IOError(f"truncated transfer ({size} of {expected} bytes)")
+            os.replace(part, path)
+            if manifest: manifest.record(path, url, size, digest.hexdigest(), expected)
             return True
         except Exception as e:
-            if attempt < retries - 1:
+            attempt += 1
+            if attempt < retries:
                 time.sleep(2)
             else:
                 flush_print(f"      [ERR] Download failed after {retries} attempts ({filename}): {e}")
+                part = path.with_name(path.name + ".part")
+                if part.exists(): part.unlink()
                 return False
     return False
 
@@ -177,21 +252,23 @@ def convert_to_html_blocks(desc_data):
             
     return html
 
-def download_video(url, output_path, retries=3):
-    # Support multiple extensions for existing file check
-    for ext in ['.mp4', '.mkv', '.webm']:
-        if os.path.exists(str(output_path) + ext): return True
+def download_video(url, output_path, retries=3, manifest=None):
+    if video_exists(output_path): return True
     
     for attempt in range(retries):
         try:
             flush_print(f"      [VIDEO] Downloading (Attempt {attempt+1}/{retries}): {url}")
             # Explicit template for output path to ensure extension handling
-            cmd = ["yt-dlp", "-f", "bestvideo[ext=mp4]+bestaudio[ext=m4a]/best", "--no-warnings", "-o", f"{str(output_path)}.%(ext)s", url]
+            cmd = ["yt-dlp", "-f", VIDEO_FORMAT, "--no-warnings", "-o", f"{str(output_path)}.%(ext)s", url]
             if COOKIES_NETSCAPE.exists():
                 cmd.extend(["--cookies", str(COOKIES_NETSCAPE)])
             
             result = subprocess.run(cmd, capture_output=True)
             if result.returncode == 0:
+                if manifest:
+                    for ext in VIDEO_EXTS:
+                        done = Path(str(output_path) + ext)
+                        if done.exists(): manifest.record(done, url, done.stat().st_size, sha256_file(done))
                 return True
             else:
                 flush_print(f"      [WARN] yt-dlp error: {result.stderr.decode('utf-8', 'ignore')}")
@@ -203,71 +280,315 @@ def download_video(url, output_path, retries=3):
             
     return False
 
-def process_node(node, parent_path, session=None):
+def collect_resources(meta):
+    all_resources = []
+    json_atts = meta.get('attachments', [])
+    if isinstance(json_atts, str):
+        try: json_atts = json.loads(json_atts)
+        except: json_atts = []
+    for a in json_atts:
+        all_resources.append({'name': a.get('title', a.get('file_name', 'File')), 'url': a.get('link', a.get('url', '#'))})
+    dom_res = meta.get('resource_links', [])
+    for r in dom_res:
+        if not any(ex['url'] == r['url'] for ex in all_resources):
+            all_resources.append({'name': r.get('name', 'Resource'), 'url': r.get('url')})
+    return all_resources
+
+def process_node(node, parent_path, jobs, write=True, wanted=None):
+    """Write content.html for each module and queue its files and videos.
+
+    wanted: ids of the selected modules, or None for everything.
+    """
     title = sanitize_filename(node.get('title', 'Untitled'))
     node_path = parent_path / title
-    os.makedirs(node_path, exist_ok=True)
-    if node.get('unitType') == 'module':
-        flush_print(f"   [SYNC] Content: {title}")
+    is_module = node.get('unitType') == 'module'
+    if is_module and wanted is not None and node.get('id') not in wanted: return
+    # With a filter, folders only appear once a selected module needs them
+    if write and (wanted is None or is_module): os.makedirs(node_path, exist_ok=True)
+    if is_module:
+        if write: flush_print(f"   [SYNC] Content: {title}")
         meta = node.get('metadata', {})
         
         body_html = convert_to_html_blocks(meta.get('desc'))
-        
-        all_resources = []
-        json_atts = meta.get('attachments', [])
-        if isinstance(json_atts, str):
-            try: json_atts = json.loads(json_atts)
-            except: json_atts = []
-        for a in json_atts:
-            all_resources.append({'name': a.get('title', a.get('file_name', 'File')), 'url': a.get('link', a.get('url', '#'))})
-        dom_res = meta.get('resource_links', [])
-        for r in dom_res:
-            if not any(ex['url'] == r['url'] for ex in all_resources):
-                all_resources.append({'name': r.get('name', 'Resource'), 'url': r.get('url')})
+        all_resources = collect_resources(meta)
         
         res_html = "<ul>"
         if not all_resources: res_html += "<li>No additional files.</li>"
         else:
-            # Expanded list of file extensions from user feedback
-            exts = ['.json', '.zip', '.pdf', '.png', '.jpg', '.jpeg', '.xlsx', '.csv', '.docx', '.pptx', '.mp3', '.mp4', '.txt', '.html', '.doc', '.xls']
             for r in all_resources:
                 res_html += f"<li><a href='{r['url']}' target='_blank'>{r['name']}</a></li>"
-                if any(ext in r['url'].lower() for ext in exts):
-                    download_file(r['url'], node_path, r['name'], session)
+                if r['url'] and r['url'].startswith('http'):
+                    jobs.append({'type': 'file', 'url': r['url'], 'folder': str(node_path), 'name': r['name']})
         res_html += "</ul>"
         
-        save_html(node.get('title'), body_html, res_html, node_path / "content.html")
+        if write: save_html(node.get('title'), body_html, res_html, node_path / "content.html")
         
         vlink = meta.get('videoLink')
-        if vlink: download_video(vlink, node_path / title)
+        if vlink: jobs.append({'type': 'video', 'url': vlink, 'folder': str(node_path), 'name': title})
         
         # Additional YouTube links from description
         y_links = re.findall(r'https://www\.(?:youtube\.com/watch\?v=|youtu\.be/)([\w-]+)', body_html)
         for i, yid in enumerate(set(y_links)):
             bonus_title = f"{title}_Bonus_{i+1}"
-            download_video(f"https://www.youtube.com/watch?v={yid}", node_path / bonus_title)
+            jobs.append({'type': 'video', 'url': f"https://www.youtube.com/watch?v={yid}", 'folder': str(node_path), 'name': bonus_title})
             
-    for child in node.get('children', []): process_node(child, node_path, session)
+    for child in node.get('children', []): process_node(child, node_path, jobs, write, wanted)
 
-def downloader():
-    flush_print("[START] RE-PARSING CONTENT...")
-    config = get_config()
-    output_base = Path(config.get("output_dir", "downloads"))
-    session = get_requests_session()
+def classify_jobs(jobs, session, config, providers, monitor=None, probe=True):
+    """Route provider links to their fetchers, probe the rest and keep only real files.
+
+    probe=False classifies from probe_cache.json alone, without network access.
+    """
+    hosted, unsupported = 0, 0
+    for job in jobs:
+        if job['type'] != 'file': continue
+        provider = find_provider(job['url'], providers)
+        if not provider: continue
+        resolved = provider.resolve(job['url'])
+        if not resolved:
+            job['type'] = 'skip'
+            unsupported += 1
+            continue
+        job['provider'] = provider.name
+        if not has_extension(job['name']): job['name'] += resolved[1]
+        hosted += 1
+    if hosted or unsupported:
+        flush_print(f"\n[HOSTS] {hosted} Drive/Docs/Dropbox/Notion links queued, {unsupported} unsupported (folders, forms, pages) left as links.")
     
-    # Convert cookies for yt-dlp
-    save_cookies_netscape(COOKIES_FILE, COOKIES_NETSCAPE)
+    file_jobs = [j for j in jobs if j['type'] == 'file' and not j.get('provider')]
+    if not file_jobs: return unique_names([j for j in jobs if j['type'] != 'skip'])
+    cache = load_probe_cache()
+    if probe:
+        flush_print(f"\n[PROBE] Classifying {len(file_jobs)} resource links...")
+        infos = probe_resources([j['url'] for j in file_jobs], session, cache, workers=int(config.get("probe_workers", 8)), monitor=monitor)
+        save_probe_cache(cache)
+    else:
+        infos = {j['url']: cache.get(j['url'], {}) for j in file_jobs}
     
-    if not MAP_FILE.exists(): return flush_print("[ERR] map.json missing.")
-    with open(MAP_FILE, 'r', encoding='utf-8') as f: data = json.load(f)
+    kept, pages = [], 0
+    for job in jobs:
+        if job['type'] == 'skip': continue
+        if job['type'] == 'file' and not job.get('provider'):
+            info = infos.get(job['url'], {})
+            kind = info.get('kind')
+            if kind == 'unknown' or not kind:
+                # Probe failed (timeout, 4xx on HEAD and GET): fall back to the URL extension
+                kind = guess_from_url(job['url'])
+            if kind == 'page': pages += 1
+            if kind != 'file': continue
+            job['name'] = resource_filename(job['name'], job['url'], info)
+            job['size'] = info.get('length')
+        kept.append(job)
+    files = sum(1 for j in kept if j['type'] == 'file' and not j.get('provider'))
+    flush_print(f"   [PROBE] {files} files to fetch, {pages} web pages skipped, {len(file_jobs) - files - pages} unknown skipped.")
+    return unique_names(kept)
+
+def unique_names(jobs):
+    """Number clashing file names within a folder ("Download", "Download (2).pdf") so no two jobs share a target"""
+    taken = set()
+    for job in jobs:
+        if job['type'] != 'file': continue
+        name = sanitize_filename(job['name'])
+        stem, ext = os.path.splitext(name) if has_extension(name) else (name, "")
+        n = 1
+        while (job['folder'], name.lower()) in taken:
+            n += 1
+            suffix = f" ({n}){ext}"
+            name = stem[:100 - len(suffix)] + suffix  # sanitize_filename keeps 100 characters
+        taken.add((job['folder'], name.lower()))
+        job['name'] = name
+    return jobs
+
+def job_done(job):
+    if job.get('redownload'): return False  # damaged copy from a verify report
+    if job['type'] == 'video': return video_exists(Path(job['folder']) / job['name'])
+    return file_exists(Path(job['folder']) / sanitize_filename(job['name']))
+
+def video_size(url):
+    """Size of the format yt-dlp would pick, from metadata only (no download)"""
+    cmd = ["yt-dlp", "-J", "--skip-download", "--no-warnings", "-f", VIDEO_FORMAT, url]
+    if COOKIES_NETSCAPE.exists():
+        cmd.extend(["--cookies", str(COOKIES_NETSCAPE)])
+    try:
+        result = subprocess.run(cmd, capture_output=True, timeout=120)
+        if result.returncode != 0: return None
+        info = json.loads(result.stdout)
+    except Exception:
+        return None
+    formats = info.get('requested_formats') or [info]
+    sizes = [f.get('filesize') or f.get('filesize_approx') for f in formats]
+    return sum(sizes) if all(sizes) else None
+
+def estimate_sizes(jobs, session, config, providers, monitor=None):
+    """Fill job['size'] for jobs that still need downloading, in parallel.
+
+    File sizes mostly come from the probe already; provider links are probed
+    on their resolved URL and videos are sized from yt-dlp metadata. Sizes are
+    cached in the probe cache so re-planning a run is cheap.
+    """
+    cache = load_probe_cache()
+    def size(job):
+        key = job['url']
+        cached = cache.get(key, {})
+        if cached.get('length'): return cached['length']
+        if job['type'] == 'video':
+            # Direct media links answer a HEAD; only hosted players need yt-dlp
+            info = probe_url(job['url'], session, monitor=monitor)
+            direct = (info.get('content_type') or '').startswith(('video/', 'audio/'))
+            n = info.get('length') if direct else video_size(job['url'])
+            if n: cache[key] = {"kind": "video", "length": n, "checked_at": int(time.time())}
+            return n
+        provider = next((p for p in providers if p.name == job.get('provider')), None)
+        if provider:
+            # Same per-host rate limit as the downloads themselves
+            n = probe_url(provider.resolve(job['url'])[0], session, monitor=monitor, throttle=provider.throttle).get('length')
+            if n: cache[key] = {"kind": "file", "length": n, "checked_at": int(time.time())}
+            return n
+        return None
+    todo = [j for j in jobs if not j.get('size')]
+    with ThreadPoolExecutor(max_workers=int(config.get("plan_workers", 4))) as pool:
+        for job, n in zip(todo, pool.map(size, todo)):
+            job['size'] = n
+    save_probe_cache(cache)
+
+def order_jobs(jobs, priority):
+    """course: map order; smallest: known sizes ascending, unknown last; files-first: files before videos"""
+    if priority == "smallest":
+        return sorted(jobs, key=lambda j: (j.get('size') is None, j.get('size') or 0))
+    if priority == "files-first":
+        return sorted(jobs, key=lambda j: j['type'] == 'video')
+    return jobs
+
+def plan_jobs(jobs, session, config, providers, output_base, monitor=None):
+    """Drop finished jobs, size the rest and report totals per course against free disk space"""
+    pending = [j for j in jobs if not job_done(j)]
+    flush_print(f"\n[PLAN] {len(jobs) - len(pending)} already downloaded, sizing {len(pending)} remaining jobs...")
+    estimate_sizes(pending, session, config, providers, monitor)
+    
+    per_course = {}
+    for j in pending:
+        total = per_course.setdefault(j.get('course', '?'), [0, 0, 0])
+        total[0] += 1
+        total[1] += j.get('size') or 0
+        if j.get('size') is None: total[2] += 1
+    for cname, (count, size, unknown) in per_course.items():
+        flush_print(f"   [PLAN] {cname}: {count} jobs, {size / 1048576:,.1f} MB" + (f" (+{unknown} unknown)" if unknown else ""))
+    
+    needed = sum(j.get('size') or 0 for j in pending)
+    unknown = sum(1 for j in pending if j.get('size') is None)
+    probe_dir = output_base
+    while not probe_dir.exists() and probe_dir != probe_dir.parent: probe_dir = probe_dir.parent
+    free = shutil.disk_usage(probe_dir).free
+    flush_print(f"   [PLAN] Total: {needed / 1073741824:,.2f} GB needed ({unknown} jobs of unknown size), {free / 1073741824:,.2f} GB free.")
+    return pending, needed, free
+
+def run_job(job, session, providers, monitor=None, manifest=None):
+    # Nothing starts while the session is being refreshed
+    if monitor and not monitor.wait(): return False
+    if job.get('redownload'): discard_damaged(job)
+    folder = Path(job['folder'])
+    if job['type'] == 'file':
+        provider = next((p for p in providers if p.name == job.get('provider')), None)
+        return download_file(job['url'], folder, job['name'], session, provider=provider, monitor=monitor, manifest=manifest)
+    return download_video(job['url'], folder / job['name'], manifest=manifest)
+
+def run_jobs(jobs, session, config, providers, monitor=None, manifest=None):
+    """Download queue: jobs start in list order on `download_workers` threads"""
+    workers = int(config.get("download_workers", 4))
+    flush_print(f"\n[QUEUE] {len(jobs)} downloads on {workers} workers...")
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(lambda j: run_job(j, session, providers, monitor, manifest), jobs))
+    if manifest: manifest.save()
+    failed = results.count(False)
+    if monitor and monitor.aborted: flush_print("   [ERR] Run stopped: session expired and cookies.json was not refreshed.")
+    if failed: flush_print(f"   [WARN] {failed} downloads failed.")
+
+def collect_jobs(data, output_base, selection=None, write=True):
+    """Walk the map (honouring the selection), writing module pages when `write`, and return all jobs"""
+    jobs = []
     for course in data.get("courses", []):
         cname = sanitize_filename(course.get('title', 'Course'))
+        hierarchy = course.get('details', {}).get('hierarchy', [])
+        state = selection.course(course.get('slug'), course.get('title')) if selection else True
+        wanted = selection.module_ids(hierarchy, state) if selection and state else None
+        if not state or wanted == set():
+            continue
         flush_print(f"\n📖 [COURSE] {cname}")
         c_path = output_base / cname
-        os.makedirs(c_path, exist_ok=True)
-        for node in course.get('details', {}).get('hierarchy', []):
-            process_node(node, c_path, session)
+        if write: os.makedirs(c_path, exist_ok=True)
+        start = len(jobs)
+        for node in hierarchy:
+            process_node(node, c_path, jobs, write=write, wanted=wanted)
+        for job in jobs[start:]: job['course'] = cname
+    return jobs
+
+def load_queue(queue_file):
+    """Jobs from a verify report. Files flagged `redownload` are replaced once their job runs."""
+    with open(queue_file, 'r', encoding='utf-8') as f: return json.load(f).get("jobs", [])
+
+def discard_damaged(job):
+    """Delete the corrupt or mismatched copy of a verify job so it is fetched again"""
+    folder = Path(job['folder'])
+    if job['type'] == 'video':
+        targets = [Path(str(folder / job['name']) + ext) for ext in VIDEO_EXTS]
+    else:
+        targets = [folder / sanitize_filename(job['name'])]
+    for t in targets:
+        if t.exists(): t.unlink()
+
+def downloader(config=None, dry_run=False, priority=None, ignore_space=False, selection=None, queue_file=None):
+    flush_print("[START] RE-PARSING CONTENT...")
+    config = config or get_config()
+    selection = selection if selection and selection.active else None
+    priority = priority or config.get("download_priority", "course")
+    output_base = Path(config.get("output_dir", "downloads"))
+    cookies_mtime = COOKIES_FILE.stat().st_mtime if COOKIES_FILE.exists() else None  # before reading them
+    session = get_requests_session()
+    
+    # Convert cookies for yt-dlp (only when cookies.json changed)
+    sync_cookies_netscape()
+    monitor = AuthMonitor(COOKIES_FILE, config.get("target_url"), timeout=int(config.get("auth_wait_timeout", 3600)),
+                          check=lambda url: session_status(session, url), loaded_mtime=cookies_mtime)
+    monitor.on_reload(lambda: load_session_cookies(session))
+    monitor.on_reload(sync_cookies_netscape)
+    
+    providers = load_providers(config)
+    if queue_file:
+        # Re-download queue from verify: jobs are already classified
+        jobs = load_queue(queue_file)
+        flush_print(f"[QUEUE] Loaded {len(jobs)} jobs from {queue_file}")
+    else:
+        if not MAP_FILE.exists(): return flush_print("[ERR] map.json missing.")
+        with open(MAP_FILE, 'r', encoding='utf-8') as f: data = json.load(f)
+        if selection: flush_print(f"[FILTER] {selection.describe()}")
+        jobs = collect_jobs(data, output_base, selection, write=not dry_run)
+        jobs = classify_jobs(jobs, session, config, providers, monitor)
+    jobs, needed, free = plan_jobs(jobs, session, config, providers, output_base, monitor)
+    if dry_run:
+        return flush_print("\n[DRY RUN] Nothing downloaded.")
+    if needed > free and not ignore_space:
+        return flush_print(f"[ERR] Not enough disk space ({needed / 1073741824:,.2f} GB needed). Free up space or pass --ignore-space.")
+    
+    flush_print(f"   [QUEUE] Priority: {priority}")
+    run_jobs(order_jobs(jobs, priority), session, config, providers, monitor, Manifest(output_base))
     flush_print("\n✅ CONTENT RE-PARSE COMPLETE!")
 
 if __name__ == "__main__":
-    downloader()
+    import argparse
+    parser = argparse.ArgumentParser(description="Download everything in map.json")
+    parser.add_argument("--dry-run", action="store_true", help="only estimate download size")
+    parser.add_argument("--priority", choices=PRIORITIES, help="queue order (default: download_priority setting or course)")
+    parser.add_argument("--ignore-space", action="store_true", help="download even if the estimate exceeds free disk space")
+    parser.add_argument("--queue", metavar="FILE", help="download the jobs listed in a verify report instead of the whole map")
+    parser.add_argument("--changed", nargs="?", const=str(DIFF_FILE), metavar="DIFF",
+                        help=f"only modules added or changed in a map diff (default: {DIFF_FILE})")
+    add_filter_args(parser)
+    args = parser.parse_args()
+    include = args.include
+    if args.changed:
+        diff = load_map(args.changed)
+        include = include + changed_patterns(diff)
+        flush_print(f"[DIFF] {summarize(diff)}")
+        if not include: sys.exit(flush_print("[DIFF] Nothing added or changed; nothing to download."))
+    downloader(dry_run=args.dry_run, priority=args.priority, ignore_space=args.ignore_space,
+               selection=Selection(include, args.exclude), queue_file=args.queue)
@@ -0,0 +1,361 @@
+"""
+Fake Skool server for offline benchmarks.
+
+Serves a synthetic community (classroom, course and module pages with
+__NEXT_DATA__ payloads), range-capable asset files and a stub video endpoint.
+Everything is generated from a seed so two runs with the same settings see
+exactly the same community.
+"""
+import hashlib
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+COMMUNITY = "bench"
+
+def _digest(*parts):
+    return hashlib.sha256("|".join(str(p) for p in parts).encode("utf-8")).hexdigest()
+
+def _payload(key, size, header=b"", trailer=b""):
+    """Deterministic filler bytes for an asset of the given size"""
+    block = hashlib.sha256(key.encode("utf-8")).digest() * 128
+    body = header + block * (size // len(block) + 1)
+    return body[:max(size - len(trailer), 0)] + trailer
+
+def _box(kind, data):
+    return (8 + len(data)).to_bytes(4, "big") + kind + data
+
+def _mp4(key, size):
+    """Minimal ISO-BMFF container: ftyp + moov + mdat padded to size"""
+    head = _box(b"ftyp", b"isom\x00\x00\x02\x00isomiso2mp41")
+    head += _box(b"moov", _box(b"mvhd", b"\x00" * 100))
+    mdat_len = max(size - len(head) - 8, 0)
+    return head + _box(b"mdat", _payload(key, mdat_len))
+
+class _QuietServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients closing streamed/ranged responses early is normal here
+        pass
+
+class FakeSkool:
+    """Synthetic community of courses x modules x assets served over HTTP"""
+
+    def __init__(self, courses=3, modules=10, assets=2, asset_size=256 * 1024,
+                 video_size=1024 * 1024, video_ratio=0.5, latency_ms=0,
+                 error_rate=0.0, seed=1, host="127.0.0.1", port=0, expire_after=None):
+        self.courses = courses
+        self.modules = modules
+        self.assets = assets
+        self.asset_size = asset_size
+        self.video_size = video_size
+        self.video_ratio = video_ratio
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.seed = seed
+        self.host = host
+        self.port = port
+        # Session simulation: after expire_after authenticated requests the
+        # current token stops working until renew() issues a new one
+        self.expire_after = expire_after
+        self.token = "session-0"
+        self.expired = False
+        self._authed = 0
+        self.stats = {"requests": 0, "bytes": 0, "errors": 0, "routes": {}}
+        self._hits = {}
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+        self.community = self._build()
+        self.files = {}
+        for course in self.community:
+            for m in self._modules(course):
+                for a in m["assets"]:
+                    self.files[a["path"]] = a
+
+    # ------------------------------------------------------------------ data
+
+    def _build(self):
+        community = []
+        for ci in range(self.courses):
+            slug = f"course-{ci + 1}"
+            sets = []
+            per_set = 5
+            for si in range(0, self.modules, per_set):
+                set_id = _digest(self.seed, slug, "set", si)[:32]
+                mods = []
+                for mi in range(si, min(si + per_set, self.modules)):
+                    mods.append(self._module(slug, ci, mi))
+                sets.append({"id": set_id, "title": f"Section {si // per_set + 1}", "modules": mods})
+            community.append({
+                "id": _digest(self.seed, slug)[:32],
+                "slug": slug,
+                "title": f"Course {ci + 1}",
+                "sets": sets,
+            })
+        return community
+
+    def _module(self, slug, ci, mi):
+        mid = _digest(self.seed, slug, "module", mi)[:32]
+        assets = []
+        for ai in range(self.assets):
+            aid = _digest(self.seed, mid, "asset", ai)[:24]
+            # Alternate extension-less /f/ links and classic asset URLs
+            if ai % 2 == 0:
+                assets.append({"name": f"Workbook {ai + 1}", "path": f"/f/{aid}",
+                               "filename": f"workbook-{ai + 1}.pdf", "type": "application/pdf"})
+            else:
+                assets.append({"name": f"Template {ai + 1}", "path": f"/assets/{aid}/template-{ai + 1}.zip",
+                               "filename": f"template-{ai + 1}.zip", "type": "application/zip"})
+        has_video = int(_digest(self.seed, mid, "video")[:8], 16) / 0xFFFFFFFF < self.video_ratio
+        return {
+            "id": mid,
+            "title": f"Lesson {ci + 1}.{mi + 1}",
+            "video": f"/video/{mid}.mp4" if has_video else None,
+            "assets": assets,
+            # Web page link whose URL contains ".html" - not a downloadable file
+            "page": f"/blog/post-{mid[:8]}.html",
+        }
+
+    def _modules(self, course):
+        for s in course["sets"]:
+            yield from s["modules"]
+
+    def _course(self, slug):
+        return next((c for c in self.community if c["slug"] == slug), None)
+
+    def _tree(self, course, full):
+        children = []
+        for s in course["sets"]:
+            mods = []
+            for m in s["modules"]:
+                meta = {"title": m["title"]}
+                if full:
+                    meta["desc"] = self._desc(m)
+                    if m["video"]:
+                        meta["videoLink"] = self.url(m["video"])
+                        meta["videoLenMs"] = 60000
+                mods.append({"course": {"id": m["id"], "name": m["id"], "unitType": "module", "metadata": meta}, "children": []})
+            children.append({"course": {"id": s["id"], "name": s["id"], "unitType": "set", "metadata": {"title": s["title"]}}, "children": mods})
+        return {"id": course["id"], "name": course["slug"], "metadata": {"title": course["title"]}, "children": children}
+
+    def _desc(self, m):
+        doc = [
+            {"type": "heading", "attrs": {"level": 2}, "content": [{"type": "text", "text": m["title"]}]},
+            {"type": "paragraph", "content": [{"type": "text", "text": "Synthetic lesson body. " * 20}]},
+        ]
+        return "[v2]" + json.dumps(doc)
+
+    def url(self, path):
+        return f"http://{self.host}:{self.port}{path}"
+
+    @property
+    def target_url(self):
+        return self.url(f"/{COMMUNITY}/classroom")
+
+    @property
+    def module_count(self):
+        return self.courses * self.modules
+
+    # ----------------------------------------------------------------- pages
+
+    def _page(self, page_props, body=""):
+        data = json.dumps({"props": {"pageProps": page_props}, "page": "/[group]/classroom"}).replace("</", "<\\/")
+        return (
+            "<!DOCTYPE html><html><head><meta charset='utf-8'><title>Fake Skool</title>"
+            f"<script id='__NEXT_DATA__' type='application/json'>{data}</script>"
+            f"<script>window.__NEXT_DATA__ = JSON.parse(document.getElementById('__NEXT_DATA__').textContent);</script>"
+            f"</head><body>{body}</body></html>"
+        ).encode("utf-8")
+
+    def classroom_page(self):
+        all_courses = [{"name": c["slug"], "id": c["id"], "metadata": {"title": c["title"], "hasAccess": 1}} for c in self.community]
+        all_courses.append({"name": "locked-course", "id": "0" * 32, "metadata": {"title": "Locked Course", "hasAccess": 0}})
+        return self._page({"allCourses": all_courses})
+
+    def course_page(self, course, module_id=None):
+        body = f"<h1>{course['title']}</h1>"
+        if module_id:
+            m = next((m for m in self._modules(course) if m["id"] == module_id), None)
+            if m is None:
+                return None
+            links = "".join(f"<li><a href='{self.url(a['path'])}'>{a['name']}</a></li>" for a in m["assets"])
+            links += f"<li><a href='{self.url(m['page'])}'>Further reading</a></li>"
+            body += f"<div class='styled-content'><p>{m['title']}</p></div><h3>Resources</h3><ul>{links}</ul>"
+        return self._page({"course": self._tree(course, full=bool(module_id))}, body)
+
+    # ------------------------------------------------------------ lifecycle
+
+    def start(self):
+        self._server = _QuietServer((self.host, self.port), _handler(self))
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def should_fail(self, path):
+        """Fail the first hit of a path for a seeded fraction of paths.
+
+        Decided per path rather than per request so the injected errors do
+        not depend on thread scheduling, and retries always recover.
+        """
+        with self._lock:
+            n = self._hits.get(path, 0) + 1
+            self._hits[path] = n
+        if n > 1 or not self.error_rate:
+            return False
+        return int(_digest(self.seed, "err", path)[:8], 16) / 0xFFFFFFFF < self.error_rate
+
+    def authorize(self, cookie_header):
+        """False when the request's auth_token is not the live session token"""
+        if self.expire_after is None and self.token == "session-0":
+            return True
+        sent = dict(p.strip().split("=", 1) for p in (cookie_header or "").split(";") if "=" in p)
+        with self._lock:
+            if self.expired or sent.get("auth_token") != self.token:
+                return False
+            self._authed += 1
+            if self.expire_after is not None and self._authed >= self.expire_after:
+                self.expired = True
+        return True
+
+    def renew(self):
+        with self._lock:
+            self.token = f"session-{int(self.token.split('-')[1]) + 1}"
+            self.expired = False
+            self.expire_after = None
+            return self.token
+
+    def record(self, route, sent, error=False):
+        with self._lock:
+            self.stats["requests"] += 1
+            self.stats["bytes"] += sent
+            if error:
+                self.stats["errors"] += 1
+            self.stats["routes"][route] = self.stats["routes"].get(route, 0) + 1
+
+def _handler(fake):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_HEAD(self):
+            self.handle_request(head=True)
+
+        def do_GET(self):
+            self.handle_request(head=False)
+
+        def handle_request(self, head):
+            if fake.latency_ms:
+                time.sleep(fake.latency_ms / 1000.0)
+            parsed = urlparse(self.path)
+            path = parsed.path.rstrip("/")
+            query = parse_qs(parsed.query)
+            route, status, body, headers = self.route(path, query)
+            if route in ("classroom", "course", "module", "asset") and not fake.authorize(self.headers.get("Cookie")):
+                if route == "asset":
+                    route, status, body, headers = "denied", 403, b"Forbidden", {"Content-Type": "text/plain"}
+                else:
+                    route, status, body, headers = "denied", 302, b"", {"Location": fake.url("/login")}
+            if status < 400 and fake.should_fail(self.path):
+                route, status, body, headers = route, 503, b"Injected failure", {"Content-Type": "text/plain"}
+            if status == 200 and headers.get("Accept-Ranges") and self.headers.get("Range"):
+                status, body, headers = self.ranged(body, headers)
+            self.send_response(status)
+            for k, v in headers.items():
+                self.send_header(k, v)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if not head:
+                self.wfile.write(body)
+            fake.record(route, 0 if head else len(body), error=status >= 400)
+
+        def ranged(self, body, headers):
+            m = re.match(r"bytes=(\d*)-(\d*)$", self.headers.get("Range", "").strip())
+            total = len(body)
+            if not m or (not m.group(1) and not m.group(2)):
+                return 416, b"", {"Content-Range": f"bytes */{total}"}
+            if m.group(1):
+                start = int(m.group(1))
+                end = int(m.group(2)) if m.group(2) else total - 1
+            else:
+                start = max(total - int(m.group(2)), 0)
+                end = total - 1
+            if start >= total:
+                return 416, b"", {"Content-Range": f"bytes */{total}"}
+            end = min(end, total - 1)
+            headers = dict(headers, **{"Content-Range": f"bytes {start}-{end}/{total}"})
+            return 206, body[start:end + 1], headers
+
+        def route(self, path, query):
+            html = {"Content-Type": "text/html; charset=utf-8"}
+            parts = path.strip("/").split("/")
+            if parts[:2] == [COMMUNITY, "classroom"]:
+                if len(parts) == 2:
+                    return "classroom", 200, fake.classroom_page(), html
+                course = fake._course(parts[2]) if len(parts) == 3 else None
+                if course:
+                    md = query.get("md", [None])[0]
+                    body = fake.course_page(course, md)
+                    if body is not None:
+                        return ("module" if md else "course"), 200, body, html
+                return "missing", 404, b"Not found", html
+            if path in fake.files:
+                a = fake.files[path]
+                # Real magic bytes and trailers so header checks (tools/verify.py) pass
+                if a["type"] == "application/pdf":
+                    header, trailer = b"%PDF-1.4\n", b"\n%%EOF\n"
+                else:
+                    header, trailer = b"PK\x03\x04", b"PK\x05\x06" + b"\x00" * 18
+                headers = {"Content-Type": a["type"], "Accept-Ranges": "bytes"}
+                if path.startswith("/f/"):
+                    headers["Content-Disposition"] = f'attachment; filename="{a["filename"]}"'
+                return "asset", 200, _payload(path, fake.asset_size, header, trailer), headers
+            if path.startswith("/video/") and path.endswith(".mp4"):
+                return "video", 200, _mp4(path, fake.video_size), {"Content-Type": "video/mp4", "Accept-Ranges": "bytes"}
+            if path == "/login":
+                return "login", 200, b"<!DOCTYPE html><html><body><h1>Log in to Skool</h1></body></html>", html
+            if path.startswith("/blog/"):
+                return "page", 200, b"<!DOCTYPE html><html><body><p>Blog post</p></body></html>", html
+            return "missing", 404, b"Not found", html
+
+    return Handler
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Serve a synthetic Skool community")
+    parser.add_argument("--courses", type=int, default=3)
+    parser.add_argument("--modules", type=int, default=10)
+    parser.add_argument("--assets", type=int, default=2)
+    parser.add_argument("--latency-ms", type=int, default=0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    fake = FakeSkool(courses=args.courses, modules=args.modules, assets=args.assets,
+                     latency_ms=args.latency_ms, error_rate=args.error_rate,
+                     seed=args.seed, port=args.port).start()
+    print(f"[FAKE] Serving {fake.module_count} modules at {fake.target_url}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        fake.stop()
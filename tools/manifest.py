@@ -0,0 +1,64 @@
+"""
+Record of completed downloads, kept next to the files in <output_dir>/manifest.json.
+
+Each entry is keyed by the path relative to the output folder and stores the
+source URL, the byte size, the server's Content-Length (when it sent one) and
+a sha256 digest, so the archive can later be verified without the network.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+MANIFEST_NAME = "manifest.json"
+
+def sha256_file(path, chunk_size=1024 * 1024):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+class Manifest:
+    def __init__(self, output_base, save_every=25):
+        self.output_base = Path(output_base)
+        self.path = self.output_base / MANIFEST_NAME
+        self.save_every = save_every
+        self._lock = threading.Lock()
+        self._dirty = 0
+        self.entries = {}
+        if self.path.exists():
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self.entries = json.load(f).get("files", {})
+            except Exception:
+                self.entries = {}
+
+    def key(self, path):
+        try: return Path(path).relative_to(self.output_base).as_posix()
+        except ValueError: return Path(path).as_posix()
+
+    def get(self, path):
+        return self.entries.get(self.key(path))
+
+    def record(self, path, url, size, sha256=None, content_length=None):
+        with self._lock:
+            self.entries[self.key(path)] = {
+                "url": url, "size": size, "sha256": sha256,
+                "content_length": content_length, "recorded_at": int(time.time()),
+            }
+            self._dirty += 1
+            flush = self._dirty >= self.save_every
+        if flush: self.save()
+
+    def save(self):
+        with self._lock:
+            if not self.entries: return
+            os.makedirs(self.output_base, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"files": self.entries}, f, indent=1)
+            os.replace(tmp, self.path)
+            self._dirty = 0
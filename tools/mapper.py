@@ -1,4 +1,7 @@
-from navigator import init_browser, load_config
+from navigator import init_browser, load_config, apply_cookies, get_project_root
+from auth import AuthMonitor, SessionExpired
+from selection import Selection, add_filter_args
+from maptree import hash_map, diff_maps, has_changes, save_diff, summarize, DIFF_FILE
 import time
 import json
 import os
@@ -11,11 +14,82 @@ def flush_print(msg):
     print(msg)
     sys.stdout.flush()
 
-def mapper():
+def settle(config, seconds):
+    """Wait for client-side hydration; `delay_scale` shortens it for local runs"""
+    time.sleep(seconds * float(config.get("delay_scale", 1)))
+
+MAP_FILE = Path("map.json")
+
+def visit(page, context, url, timeout, monitor):
+    """page.goto that pauses on an expired session and retries once cookies are refreshed"""
+    while True:
+        response = page.goto(url, wait_until="domcontentloaded", timeout=timeout)
+        if not monitor.report(url, response.status if response else None, page.url):
+            return response
+        if not monitor.wait():
+            raise SessionExpired("cookies.json was not refreshed")
+        apply_cookies(context)
+
+def page_status(context, url):
+    """(status, final URL) of a login-only page fetched with the browser's cookies"""
+    r = context.request.get(url, timeout=15000)
+    return r.status, r.url
+
+def load_previous_map():
+    if not MAP_FILE.exists(): return {"courses": []}
+    try:
+        with open(MAP_FILE, "r", encoding="utf-8") as f: return json.load(f)
+    except Exception as e:
+        flush_print(f"[WARN] Could not read existing map.json: {e}")
+        return {"courses": []}
+
+def index_nodes(nodes, index=None):
+    index = {} if index is None else index
+    for node in nodes:
+        index[node.get('id')] = node
+        index_nodes(node.get('children', []), index)
+    return index
+
+def merge_courses(old_courses, new_courses, courses_data):
+    """Scanned courses replace their old entries; everything else is kept as it was"""
+    new_by_key = {c.get('slug') or c['title']: c for c in new_courses}
+    old_by_key = {}
+    for c in old_courses:
+        old_by_key.setdefault(c.get('slug') or c['title'], c)
+        old_by_key.setdefault(c['title'], c)
+    merged, used = [], set()
+    for c_meta in courses_data:
+        key, title = c_meta.get('name'), c_meta['metadata']['title']
+        old = old_by_key.get(key) or old_by_key.get(title)
+        entry = new_by_key.get(key) or old
+        if old: used.add(id(old))
+        if entry and entry not in merged:
+            merged.append(entry)
+    # Courses no longer listed in the classroom stay at the end
+    merged += [c for c in old_courses if id(c) not in used]
+    return merged
+
+def save_map(full_map, previous, courses_data, merge=False):
+    """Write map.json (merged with the previous map for partial runs) plus its diff"""
+    if merge:
+        full_map["courses"] = merge_courses(previous["courses"], full_map["courses"], courses_data)
+    # Hash tree: lets sync/re-download touch only what changed since the last map
+    hash_map(full_map)
+    if previous["courses"]:
+        diff = diff_maps(previous, full_map)
+        save_diff(diff)
+        flush_print(f"\n[DIFF] {summarize(diff) if has_changes(diff) else 'No changes'} since last map ({DIFF_FILE}).")
+    with open(MAP_FILE, "w", encoding="utf-8") as f:
+        json.dump(full_map, f, indent=2)
+
+def mapper(config=None, selection=None):
     flush_print("[MAP] Visual Mapper Starting (Deep Scan v4 - Resource Focus)...")
+    selection = selection if selection and selection.active else None
     try:
+        cookies_file = get_project_root() / "cookies.json"
+        cookies_mtime = cookies_file.stat().st_mtime if cookies_file.exists() else None  # before init_browser reads them
         p, browser, context, page = init_browser(headless=True)
-        config = load_config()
+        config = config or load_config()
         
         base_url = config.get("target_url", "").rstrip('/')
         if not base_url:
@@ -23,15 +97,19 @@ def mapper():
             return
 
         classroom_url = base_url if "/classroom" in base_url.lower() else base_url + "/classroom"
+        monitor = AuthMonitor(cookies_file, base_url, timeout=int(config.get("auth_wait_timeout", 3600)),
+                              check=lambda url: page_status(context, url), loaded_mtime=cookies_mtime)
         
         flush_print(f"[NAV] Accessing Classroom: {classroom_url}")
-        page.goto(classroom_url, wait_until="domcontentloaded", timeout=60000)
-        time.sleep(5)
+        visit(page, context, classroom_url, 60000, monitor)
+        settle(config, 5)
         
         courses_data = page.evaluate("() => window.__NEXT_DATA__?.props?.pageProps?.allCourses || []")
         flush_print(f"[OK] Found {len(courses_data)} total courses.")
         
         full_map = {"courses": []}
+        previous = load_previous_map()
+        if selection: flush_print(f"[FILTER] {selection.describe()}")
         
         for idx, c_meta in enumerate(courses_data):
             title = c_meta['metadata']['title']
@@ -41,10 +119,15 @@ def mapper():
                 flush_print(f"\n[SKIP] {title}")
                 continue
             
+            state = selection.course(slug, title) if selection else True
+            if not state:
+                flush_print(f"\n[FILTER] Keeping previous map for: {title}")
+                continue
+            
             flush_print(f"\n[COURSE {idx+1}/{len(courses_data)}] Scanning: {title}")
             course_url = f"{classroom_url}/{slug}"
-            page.goto(course_url, wait_until="domcontentloaded", timeout=45000)
-            time.sleep(5)
+            visit(page, context, course_url, 45000, monitor)
+            settle(config, 5)
 
             hierarchy = page.evaluate("""() => {
                 const props = window.__NEXT_DATA__.props.pageProps;
@@ -55,17 +138,27 @@ def mapper():
                 return props.course?.children?.map(build) || [];
             }""")
 
+            wanted = selection.module_ids(hierarchy, state) if selection else None
+            old_course = next((c for c in previous["courses"] if c.get('slug') == slug or c['title'] == title), None)
+            old_nodes = index_nodes(old_course['details'].get('hierarchy', [])) if old_course else {}
+            if wanted is not None and not wanted:
+                flush_print(f"\n[FILTER] No selected modules in: {title}")
+                continue
+
             def deep_scan_list(nodes, depth=0):
                 indent = "      " + ("  " * depth)
                 for node in nodes:
-                    if node['unitType'] == 'module':
+                    if node['unitType'] == 'module' and wanted is not None and node['id'] not in wanted:
+                        # Not selected: keep what the last full scan found
+                        node['metadata'] = old_nodes.get(node['id'], {}).get('metadata', {})
+                    elif node['unitType'] == 'module':
                         flush_print(f"{indent}[FETCH] Analyzing: {node['title']}...")
                         murl = f"{course_url}?md={node['id']}"
                         
                         try:
                             # Visit module to hydrate both JSON and DOM
-                            page.goto(murl, wait_until="domcontentloaded", timeout=30000)
-                            time.sleep(4) 
+                            visit(page, context, murl, 30000, monitor)
+                            settle(config, 4)
                             
                             # Advanced Extraction: JSON state + Aggressive DOM Scraping
                             extraction = page.evaluate(f"""(mid) => {{
@@ -132,6 +225,8 @@ def mapper():
                                 flush_print(f"{indent}[OK] Found: Video={has_v}, Assets={has_a}")
                             else:
                                 flush_print(f"{indent}[WARN] Empty Module.")
+                        except SessionExpired:
+                            raise
                         except Exception as e:
                             flush_print(f"{indent}[ERR] Fail: {e}")
                     else:
@@ -139,18 +234,26 @@ def mapper():
                         deep_scan_list(node.get('children', []), depth + 1)
 
             deep_scan_list(hierarchy)
-            full_map["courses"].append({"title": title, "details": {"hierarchy": hierarchy}})
+            full_map["courses"].append({"title": title, "slug": slug, "id": c_meta.get('id'), "details": {"hierarchy": hierarchy}})
 
-        with open("map.json", "w", encoding="utf-8") as f:
-            json.dump(full_map, f, indent=2)
-            
+        save_map(full_map, previous, courses_data, merge=bool(selection))
         flush_print("\n[FINISH] Deep Map Complete.")
         browser.close()
         p.stop()
+    except SessionExpired:
+        # Keep what was mapped before the session ran out; unfinished courses keep their old entries
+        flush_print("\n[ERR] Session expired and cookies.json was not refreshed. Saving the courses mapped so far.")
+        if 'full_map' in locals(): save_map(full_map, previous, courses_data, merge=True)
+        if 'browser' in locals(): browser.close()
+        if 'p' in locals(): p.stop()
     except Exception as e:
         flush_print(f"\n[CRITICAL ERROR] {e}")
         if 'browser' in locals(): browser.close()
         if 'p' in locals(): p.stop()
 
 if __name__ == "__main__":
-    mapper()
+    import argparse
+    parser = argparse.ArgumentParser(description="Map the community's courses into map.json")
+    add_filter_args(parser)
+    args = parser.parse_args()
+    mapper(selection=Selection(args.include, args.exclude))
@@ -0,0 +1,165 @@
+"""
+Hash tree over map.json for cheap change detection between runs.
+
+Every module gets a sha256 of its own content (title, type, metadata), every
+set a hash of its title plus its children's hashes, and every course a hash of
+its hierarchy, so an unchanged subtree is recognised from a single comparison.
+The hashes are stored in the map itself ("hash" on nodes and courses, plus a
+root hash), and diff_maps() only descends into subtrees whose hash differs.
+
+    python tools/maptree.py hash [map.json]
+    python tools/maptree.py diff old_map.json map.json [--output map_diff.json]
+"""
+import argparse
+import hashlib
+import json
+import sys
+import time
+from pathlib import Path
+
+DIFF_FILE = Path("map_diff.json")
+
+def _digest(*parts):
+    h = hashlib.sha256()
+    for p in parts:
+        h.update(p.encode("utf-8") if isinstance(p, str) else p)
+        h.update(b"\x00")
+    return h.hexdigest()
+
+def _canonical(value):
+    return json.dumps(value, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+
+def hash_node(node):
+    """Set node["hash"] for this node and its subtree, returning it"""
+    children = [hash_node(c) for c in node.get("children", [])]
+    own = _canonical({k: node.get(k) for k in ("id", "title", "unitType", "metadata")})
+    node["hash"] = _digest(own, *children)
+    return node["hash"]
+
+def hash_course(course):
+    hierarchy = course.get("details", {}).get("hierarchy", [])
+    # Only the title names anything on disk; slug/id are lookup keys (absent from older maps)
+    own = _canonical({"title": course.get("title")})
+    course["hash"] = _digest(own, *(hash_node(n) for n in hierarchy))
+    return course["hash"]
+
+def hash_map(data):
+    """Annotate a map in place with module, set, course and root hashes"""
+    data["hash"] = _digest(*(hash_course(c) for c in data.get("courses", [])))
+    return data
+
+def course_key(course):
+    return course.get("slug") or course.get("title")
+
+def _entry(node, course, path):
+    return {"id": node.get("id"), "unitType": node.get("unitType"), "course": course, "path": "/".join(path)}
+
+def _diff_nodes(old_nodes, new_nodes, course, path, out):
+    old_by_id = {n.get("id"): n for n in old_nodes}
+    new_ids = set()
+    for node in new_nodes:
+        new_ids.add(node.get("id"))
+        here = path + [node.get("title") or ""]
+        old = old_by_id.get(node.get("id"))
+        if old is None:
+            out["added"].append(_entry(node, course, here))
+            continue
+        if old.get("hash") == node.get("hash"):
+            continue  # identical subtree
+        if node.get("unitType") == "module" or old.get("title") != node.get("title"):
+            entry = _entry(node, course, here)
+            if old.get("title") != node.get("title"):
+                entry["renamed_from"] = "/".join(path + [old.get("title") or ""])
+            out["changed"].append(entry)
+        _diff_nodes(old.get("children", []), node.get("children", []), course, here, out)
+    for node in old_nodes:
+        if node.get("id") not in new_ids:
+            out["removed"].append(_entry(node, course, path + [node.get("title") or ""]))
+
+def diff_maps(old, new):
+    """Compact diff: courses and nodes added, removed or changed between two maps.
+
+    Courses are matched by slug, or by title when either side has no slug.
+    Both maps are (re)hashed first; unchanged courses and subtrees are then
+    skipped without being walked.
+    """
+    for data in (old, new):
+        hash_map(data)  # recomputed: hashes stored by an older version may use other inputs
+    diff = {
+        "generated_at": int(time.time()),
+        "from": old.get("hash"),
+        "to": new.get("hash"),
+        "courses": {"added": [], "removed": [], "changed": []},
+        "added": [], "removed": [], "changed": [],
+    }
+    if old.get("hash") == new.get("hash"): return diff
+    old_courses = old.get("courses", [])
+    by_slug = {c["slug"]: c for c in old_courses if c.get("slug")}
+    by_title = {}
+    for c in old_courses: by_title.setdefault(c.get("title"), c)
+    matched = set()
+    for course in new.get("courses", []):
+        key = course_key(course)
+        prev = by_slug.get(course.get("slug")) if course.get("slug") else None
+        if prev is None:
+            # Maps written before slugs were recorded: fall back to the title, like merge_courses
+            prev = by_title.get(course.get("title"))
+            if prev is not None and prev.get("slug") and course.get("slug"): prev = None
+        if prev is not None and id(prev) in matched: prev = None
+        if prev is None:
+            diff["courses"]["added"].append(key)
+            continue
+        matched.add(id(prev))
+        if prev.get("hash") != course.get("hash"):
+            diff["courses"]["changed"].append(key)
+            _diff_nodes(prev.get("details", {}).get("hierarchy", []),
+                        course.get("details", {}).get("hierarchy", []), key, [course.get("title") or ""], diff)
+    diff["courses"]["removed"] = [course_key(c) for c in old_courses if id(c) not in matched]
+    return diff
+
+def has_changes(diff):
+    return any(diff["courses"].values()) or any(diff[k] for k in ("added", "removed", "changed"))
+
+def changed_patterns(diff):
+    """Selection include patterns covering everything added or changed"""
+    nodes = diff["added"] + diff["changed"]
+    touched = {e["course"] for e in nodes}
+    # A course whose own entry changed (e.g. renamed) without node changes is redone as a whole
+    whole = diff["courses"]["added"] + [k for k in diff["courses"]["changed"] if k not in touched]
+    return whole + [f"id:{e['id']}" for e in nodes if e.get("id")]
+
+def summarize(diff):
+    c = diff["courses"]
+    return (f"courses +{len(c['added'])} -{len(c['removed'])} ~{len(c['changed'])}, "
+            f"nodes +{len(diff['added'])} -{len(diff['removed'])} ~{len(diff['changed'])}")
+
+def load_map(path):
+    with open(path, "r", encoding="utf-8") as f: return json.load(f)
+
+def save_diff(diff, path=DIFF_FILE):
+    with open(path, "w", encoding="utf-8") as f: json.dump(diff, f, indent=2)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Hash map.json and diff two map versions")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_hash = sub.add_parser("hash", help="add hashes to a map file in place")
+    p_hash.add_argument("map", nargs="?", default="map.json")
+    p_diff = sub.add_parser("diff", help="compare two map files")
+    p_diff.add_argument("old")
+    p_diff.add_argument("new")
+    p_diff.add_argument("--output", help=f"write the diff here (e.g. {DIFF_FILE}) instead of stdout")
+    args = parser.parse_args()
+
+    if args.command == "hash":
+        data = hash_map(load_map(args.map))
+        with open(args.map, "w", encoding="utf-8") as f: json.dump(data, f, indent=2)
+        print(f"[HASH] {args.map}: {data['hash']}")
+    else:
+        diff = diff_maps(load_map(args.old), load_map(args.new))
+        if args.output:
+            save_diff(diff, args.output)
+            print(f"[DIFF] {summarize(diff)} -> {args.output}")
+        else:
+            json.dump(diff, sys.stdout, indent=2)
+            print()
+        sys.exit(1 if has_changes(diff) else 0)
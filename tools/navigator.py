@@ -27,6 +27,15 @@ def load_cookies():
     with open(path, "r", encoding="utf-8") as f:
         return json.load(f)
 
+def apply_cookies(context):
+    """(Re)load cookies.json into a browser context"""
+    cookies = load_cookies()
+    for c in cookies:
+        if "sameSite" in c and c["sameSite"] not in ["Strict", "Lax", "None"]:
+            del c["sameSite"]
+    context.clear_cookies()
+    context.add_cookies(cookies)
+
 def init_browser(headless=False):
     p = sync_playwright().start()
     browser = p.chromium.launch(
@@ -45,11 +54,7 @@ def init_browser(headless=False):
         locale="en-US"
     )
     try:
-        cookies = load_cookies()
-        for c in cookies:
-            if "sameSite" in c and c["sameSite"] not in ["Strict", "Lax", "None"]:
-                del c["sameSite"]
-        context.add_cookies(cookies)
+        apply_cookies(context)
         print("   [COOKIE] Injected successfully.")
     except Exception as e:
         print(f"   [WARN] Cookie Injection: {e}")
@@ -0,0 +1,135 @@
+"""
+Content-type probing for resource links.
+
+Resource URLs from the map say little about what they point to: Skool /f/
+links have no extension, and plenty of web pages have ".html" somewhere in
+the URL. Each link is probed with HEAD (falling back to a one-byte ranged GET)
+and classified by Content-Type/Content-Disposition. Results are cached per URL
+in probe_cache.json so later runs skip the network round-trip.
+"""
+import json
+import mimetypes
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import urlparse, unquote
+
+PROBE_CACHE = Path("probe_cache.json")
+
+# Content types that are web pages rather than downloadable files
+PAGE_TYPES = ("text/html", "application/xhtml+xml")
+
+# Used only when a probe fails and we must guess from the URL itself
+FALLBACK_EXTS = ['.json', '.zip', '.pdf', '.png', '.jpg', '.jpeg', '.xlsx', '.csv', '.docx', '.pptx', '.mp3', '.mp4', '.txt', '.doc', '.xls']
+
+_cache_lock = threading.Lock()
+
+def load_probe_cache(path=PROBE_CACHE):
+    if not path.exists(): return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+def save_probe_cache(cache, path=PROBE_CACHE):
+    tmp = path.with_suffix(".tmp")
+    with _cache_lock:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(cache, f, indent=1)
+        os.replace(tmp, path)
+
+def disposition_filename(header):
+    if not header: return None
+    m = re.search(r"filename\*=(?:UTF-8'')?([^;]+)", header, re.I)
+    if m: return unquote(m.group(1).strip().strip('"'))
+    m = re.search(r'filename="?([^";]+)"?', header, re.I)
+    return m.group(1).strip() if m else None
+
+def classify(content_type, disposition=None):
+    """'file' for downloadable content, 'page' for web pages"""
+    if disposition and disposition.lower().startswith("attachment"):
+        return "file"
+    ctype = (content_type or "").split(";")[0].strip().lower()
+    if not ctype:
+        return "unknown"
+    return "page" if ctype in PAGE_TYPES else "file"
+
+def guess_from_url(url):
+    """Old extension heuristic, matched on the URL path instead of anywhere in the URL"""
+    path = urlparse(url).path.lower()
+    return "file" if any(path.endswith(ext) for ext in FALLBACK_EXTS) else "unknown"
+
+def _total_length(r):
+    content_range = r.headers.get("Content-Range", "")
+    if "/" in content_range and not content_range.endswith("/*"):
+        return int(content_range.rsplit("/", 1)[1])
+    if r.headers.get("Content-Length") and r.status_code == 200:
+        return int(r.headers["Content-Length"])
+    return None
+
+def probe_url(url, session, timeout=15, monitor=None, throttle=None):
+    """HEAD the URL, falling back to a ranged GET when HEAD is refused or uninformative.
+
+    throttle: called before every request (a provider's rate limit).
+    """
+    throttle = throttle or (lambda: None)
+    info = {"status": None, "content_type": None, "length": None, "filename": None,
+            "final_url": None, "kind": "unknown", "checked_at": int(time.time())}
+    try:
+        while True:
+            generation = monitor.generation if monitor else None
+            throttle()
+            r = session.head(url, allow_redirects=True, timeout=timeout)
+            if r.status_code >= 400 or not r.headers.get("Content-Type"):
+                r.close()
+                throttle()
+                r = session.get(url, headers={"Range": "bytes=0-0"}, stream=True, allow_redirects=True, timeout=timeout)
+                r.close()
+            if not (monitor and monitor.report(url, r.status_code, r.url, generation)): break
+            if not monitor.wait(): break
+        info["status"] = r.status_code
+        info["final_url"] = r.url
+        if r.status_code < 400:
+            disposition = r.headers.get("Content-Disposition")
+            info["content_type"] = r.headers.get("Content-Type")
+            info["length"] = _total_length(r)
+            info["filename"] = disposition_filename(disposition)
+            info["kind"] = classify(info["content_type"], disposition)
+    except Exception as e:
+        info["error"] = str(e)
+    return info
+
+def probe_resources(urls, session, cache, workers=8, monitor=None):
+    """Probe every URL not already classified in the cache, in parallel.
+
+    Failed probes are not trusted from the cache and get retried next run.
+    Returns {url: info} for all requested URLs.
+    """
+    todo = [u for u in dict.fromkeys(urls) if cache.get(u, {}).get("kind") not in ("file", "page")]
+    if todo:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for url, info in zip(todo, pool.map(lambda u: probe_url(u, session, monitor=monitor), todo)):
+                cache[url] = info
+    return {u: cache.get(u, {}) for u in urls}
+
+# Suffixes that count as a real file extension (so "Lesson 1.2" or "Slides v2.0" do not)
+KNOWN_EXTS = set(mimetypes.types_map) | set(FALLBACK_EXTS) | {
+    '.mkv', '.webm', '.m4a', '.m4v', '.epub', '.key', '.numbers', '.pages', '.psd', '.ai', '.sketch', '.fig', '.rar', '.7z'}
+
+def has_extension(name):
+    ext = os.path.splitext(name)[1].lower()
+    return ext in KNOWN_EXTS and not ext[1:].isdigit()
+
+def resource_filename(name, url, info):
+    """Name to save a resource under, adding an extension when the link name lacks one"""
+    if has_extension(name):
+        return name
+    real = info.get("filename") or os.path.basename(urlparse(info.get("final_url") or url).path)
+    ext = os.path.splitext(real)[1]
+    if not ext and info.get("content_type"):
+        ext = mimetypes.guess_extension(info["content_type"].split(";")[0].strip()) or ""
+    return name + ext
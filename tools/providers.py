@@ -0,0 +1,159 @@
+"""
+Host-specific fetchers for external resource links.
+
+Share links on Google Drive, Google Docs, Dropbox and Notion point at viewer
+pages, not files. Each provider turns a share link into a direct download (or
+export) URL and opens it, handling any host quirks such as Drive's large-file
+confirmation page. Providers are rate limited independently so one slow host
+cannot get the whole queue throttled.
+"""
+import re
+import threading
+import time
+from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
+from html import unescape
+
+def is_html(r):
+    return r.headers.get("Content-Type", "").startswith("text/html")
+
+def reject_html(r, message):
+    """Export and direct URLs never legitimately answer with HTML: that is a sign-in or error page"""
+    if is_html(r) and r.ok:
+        r.close()
+        raise ValueError(message)
+    return r
+
+class Provider:
+    name = "generic"
+    hosts = ()
+    min_interval = 0.0  # seconds between requests to this provider
+
+    def __init__(self, min_interval=None):
+        if min_interval is not None:
+            self.min_interval = float(min_interval)
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def matches(self, url):
+        host = (urlparse(url).hostname or "").lower()
+        return any(host == h or host.endswith("." + h) for h in self.hosts)
+
+    def resolve(self, url):
+        """Return (direct_url, extension) or None when the link cannot be fetched"""
+        return url, ""
+
+    def throttle(self):
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next - now
+            self._next = max(now, self._next) + self.min_interval
+        if wait > 0:
+            time.sleep(wait)
+
+    def get(self, url, session, timeout=30):
+        """Throttled GET of the resolved download URL, whatever it returns"""
+        self.throttle()
+        resolved = self.resolve(url)
+        if not resolved:
+            raise ValueError(f"{self.name}: unsupported link {url}")
+        return session.get(resolved[0], stream=True, timeout=timeout)
+
+    def open(self, url, session, timeout=30):
+        return reject_html(self.get(url, session, timeout), f"{self.name} returned a web page instead of the file (private, deleted or sign-in required)")
+
+class GoogleDrive(Provider):
+    name = "gdrive"
+    hosts = ("drive.google.com", "drive.usercontent.google.com")
+    min_interval = 1.0
+
+    def file_id(self, url):
+        m = re.search(r"/file/d/([\w-]+)", url)
+        if m: return m.group(1)
+        return parse_qs(urlparse(url).query).get("id", [None])[0]
+
+    def resolve(self, url):
+        fid = self.file_id(url)
+        if not fid:
+            return None  # folders and other viewer pages
+        return f"https://drive.google.com/uc?export=download&id={fid}", ""
+
+    def open(self, url, session, timeout=30):
+        r = self.get(url, session, timeout)
+        if not is_html(r) or not r.ok:
+            return r
+        # Files too large for virus scanning get an interstitial page with a confirm form
+        page = r.text
+        r.close()
+        form = re.search(r'<form[^>]+id="download-form"[^>]+action="([^"]+)"', page)
+        if form:
+            params = dict(re.findall(r'<input type="hidden" name="([^"]+)" value="([^"]*)"', page))
+            self.throttle()
+            r = session.get(unescape(form.group(1)), params=params, stream=True, timeout=timeout)
+        else:
+            token = re.search(r"confirm=([\w-]+)", page)
+            token = token.group(1) if token else next((v for k, v in session.cookies.items() if k.startswith("download_warning")), None)
+            if not token:
+                raise ValueError("Google Drive returned a page instead of the file (private or quota exceeded)")
+            self.throttle()
+            r = session.get(self.resolve(url)[0] + f"&confirm={token}", stream=True, timeout=timeout)
+        return reject_html(r, "Google Drive confirmation did not return the file")
+
+class GoogleDocs(Provider):
+    name = "gdocs"
+    hosts = ("docs.google.com",)
+    min_interval = 1.0
+    # Editor type -> (export format, file extension)
+    EXPORTS = {
+        "document": ("pdf", ".pdf"),
+        "spreadsheets": ("xlsx", ".xlsx"),
+        "presentation": ("pdf", ".pdf"),
+    }
+
+    def resolve(self, url):
+        m = re.search(r"/(document|spreadsheets|presentation)/d/([\w-]+)", url)
+        if not m:
+            return None  # forms, published pages, etc.
+        kind, doc_id = m.groups()
+        fmt, ext = self.EXPORTS[kind]
+        return f"https://docs.google.com/{kind}/d/{doc_id}/export?format={fmt}", ext
+
+class Dropbox(Provider):
+    name = "dropbox"
+    hosts = ("dropbox.com",)
+    min_interval = 0.5
+
+    def resolve(self, url):
+        parts = urlparse(url)
+        query = {k: v[0] for k, v in parse_qs(parts.query).items()}
+        query.pop("raw", None)
+        query["dl"] = "1"
+        path = parts.path
+        # Folder links come back as a zip archive
+        ext = ".zip" if path.startswith(("/sh/", "/scl/fo/")) else ""
+        if not ext:
+            m = re.search(r"(\.[A-Za-z0-9]{1,5})$", path)
+            ext = m.group(1) if m else ""
+        return urlunparse(parts._replace(netloc="www.dropbox.com", query=urlencode(query))), ext
+
+class Notion(Provider):
+    name = "notion"
+    hosts = ("notion.site", "notion.so", "file.notion.so")
+    min_interval = 0.5
+
+    def resolve(self, url):
+        host = urlparse(url).hostname or ""
+        path = urlparse(url).path
+        if host == "file.notion.so" or "/image/" in path or "/f/" in path:
+            m = re.search(r"(\.[A-Za-z0-9]{1,5})$", path)
+            return url, m.group(1) if m else ""
+        return None  # pages have no export without an API token; keep them as links
+
+PROVIDERS = [GoogleDrive, GoogleDocs, Dropbox, Notion]
+
+def load_providers(config):
+    """Instantiate providers, applying `provider_rate_limits` overrides ({name: seconds})"""
+    limits = config.get("provider_rate_limits", {})
+    return [cls(limits.get(cls.name)) for cls in PROVIDERS]
+
+def find_provider(url, providers):
+    return next((p for p in providers if p.matches(url)), None)
@@ -0,0 +1,75 @@
+"""
+Course/module filters shared by the mapper and the downloader.
+
+A pattern matches a course by slug or by title glob (case-insensitive), or a
+set/module by its id. Prefixes force one interpretation: "slug:", "title:",
+"id:". Unprefixed 32-character hex strings are treated as ids.
+
+Selecting a set or module id selects its whole subtree; excludes always win.
+"""
+import re
+from fnmatch import fnmatch
+
+ID_RE = re.compile(r"^[0-9a-f]{32}$")
+
+def _parse(patterns):
+    courses, ids = [], set()
+    for p in patterns or []:
+        p = p.strip()
+        if not p: continue
+        kind, _, value = p.partition(":")
+        if kind == "id" and value:
+            ids.add(value)
+        elif kind in ("slug", "title") and value:
+            courses.append((kind, value))
+        elif ID_RE.match(p):
+            ids.add(p)
+        else:
+            courses.append((None, p))
+    return courses, ids
+
+def _course_match(patterns, slug, title):
+    for kind, value in patterns:
+        if kind in (None, "slug") and slug and value == slug: return True
+        if kind in (None, "title") and fnmatch((title or "").lower(), value.lower()): return True
+    return False
+
+class Selection:
+    def __init__(self, include=None, exclude=None):
+        self.include, self.include_ids = _parse(include)
+        self.exclude, self.exclude_ids = _parse(exclude)
+
+    @property
+    def active(self):
+        return bool(self.include or self.include_ids or self.exclude or self.exclude_ids)
+
+    def course(self, slug, title):
+        """True: whole course, "partial": only included ids inside it, False: skip"""
+        if _course_match(self.exclude, slug, title): return False
+        if not (self.include or self.include_ids): return True
+        if _course_match(self.include, slug, title): return True
+        return "partial" if self.include_ids else False
+
+    def module_ids(self, nodes, whole=True):
+        """Ids of the modules selected in a course hierarchy"""
+        selected = set()
+        def walk(nodes, inside):
+            for node in nodes:
+                if node.get('id') in self.exclude_ids: continue
+                here = inside or node.get('id') in self.include_ids
+                if node.get('unitType') == 'module':
+                    if here: selected.add(node.get('id'))
+                walk(node.get('children', []), here)
+        walk(nodes, whole is True)
+        return selected
+
+    def describe(self):
+        parts = [f"include={[v for _, v in self.include] + sorted(self.include_ids)}" if (self.include or self.include_ids) else "",
+                 f"exclude={[v for _, v in self.exclude] + sorted(self.exclude_ids)}" if (self.exclude or self.exclude_ids) else ""]
+        return " ".join(p for p in parts if p)
+
+def add_filter_args(parser):
+    parser.add_argument("--include", action="append", default=[], metavar="PATTERN",
+                        help="only handle this course slug, title glob or set/module id (repeatable)")
+    parser.add_argument("--exclude", action="append", default=[], metavar="PATTERN",
+                        help="skip this course slug, title glob or set/module id (repeatable)")
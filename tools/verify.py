@@ -0,0 +1,162 @@
+"""
+Offline integrity check of the download folder against map.json.
+
+Every file and video the downloader would produce is checked in a process
+pool: presence, size against the manifest (or the probed Content-Length),
+sha256 against the manifest, and a structural header check for video
+containers, PDFs and ZIP-based documents. Problems are written as a
+downloader job queue:
+
+    python tools/verify.py
+    python tools/downloader.py --queue verify_queue.json
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from downloader import (MAP_FILE, VIDEO_EXTS, collect_jobs, classify_jobs, file_exists,
+                        get_config, sanitize_filename, flush_print)
+from manifest import Manifest, sha256_file
+from providers import load_providers
+from selection import Selection, add_filter_args
+
+QUEUE_FILE = Path("verify_queue.json")
+
+def _boxes_ok(path, size):
+    """ISO-BMFF (mp4/m4a/mov): top-level boxes must tile the file and include ftyp and moov"""
+    seen, pos = set(), 0
+    with open(path, "rb") as f:
+        while pos < size:
+            f.seek(pos)
+            head = f.read(16)
+            if len(head) < 8: return False
+            box_len = int.from_bytes(head[:4], "big")
+            kind = head[4:8]
+            if box_len == 1:
+                if len(head) < 16: return False
+                box_len = int.from_bytes(head[8:16], "big")
+            elif box_len == 0:
+                box_len = size - pos  # box runs to end of file
+            if box_len < 8 or pos + box_len > size: return False
+            seen.add(kind)
+            pos += box_len
+    return b"ftyp" in seen and b"moov" in seen
+
+def _ebml_ok(path):
+    """Matroska/WebM: EBML magic followed by a Segment element near the start"""
+    with open(path, "rb") as f:
+        head = f.read(4096)
+    return head[:4] == b"\x1a\x45\xdf\xa3" and b"\x18\x53\x80\x67" in head
+
+def _tail(path, size, n):
+    with open(path, "rb") as f:
+        f.seek(max(size - n, 0))
+        return f.read()
+
+def container_ok(path, size):
+    """None when the format has no structural check, else True/False"""
+    ext = path.suffix.lower()
+    with open(path, "rb") as f:
+        head = f.read(8)
+    if ext in (".mp4", ".m4a", ".m4v", ".mov"):
+        return _boxes_ok(path, size)
+    if ext in (".mkv", ".webm"):
+        return _ebml_ok(path)
+    if ext == ".pdf":
+        return head.startswith(b"%PDF") and b"%%EOF" in _tail(path, size, 2048)
+    if ext in (".zip", ".docx", ".xlsx", ".pptx"):
+        return head.startswith(b"PK") and b"PK\x05\x06" in _tail(path, size, 65557)
+    return None
+
+def check_artifact(task):
+    """Runs in a worker process. Returns (index, status, path found, detail)."""
+    idx, paths, expected_size, sha256, checksum = task
+    path = next((Path(p) for p in paths if os.path.exists(p)), None)
+    if path is None:
+        return idx, "missing", None, None
+    size = path.stat().st_size
+    if size == 0:
+        return idx, "corrupt", str(path), "empty file"
+    if expected_size and size != expected_size:
+        return idx, "size_mismatch", str(path), f"{size} bytes on disk, expected {expected_size}"
+    try:
+        if container_ok(path, size) is False:
+            return idx, "corrupt", str(path), f"unreadable {path.suffix} container"
+        if checksum and sha256 and sha256_file(path) != sha256:
+            return idx, "checksum_mismatch", str(path), None
+    except OSError as e:
+        return idx, "corrupt", str(path), str(e)
+    return idx, "ok", str(path), None
+
+def artifact_paths(job):
+    folder = Path(job['folder'])
+    if job['type'] == 'video':
+        return [str(folder / job['name']) + ext for ext in VIDEO_EXTS]
+    path = folder / sanitize_filename(job['name'])
+    if path.exists() or not file_exists(path):
+        return [str(path)]
+    # Extension was added from the response: take whatever the downloader saved
+    return [str(p) for p in sorted(path.parent.glob(glob.escape(path.name) + ".*")) if p.suffix != ".part"]
+
+def verify(config=None, workers=None, checksum=True, selection=None, output=QUEUE_FILE):
+    flush_print("[VERIFY] Checking archive against map.json...")
+    config = config or get_config()
+    output_base = Path(config.get("output_dir", "downloads"))
+    if not MAP_FILE.exists(): return flush_print("[ERR] map.json missing.")
+    with open(MAP_FILE, 'r', encoding='utf-8') as f: data = json.load(f)
+
+    jobs = collect_jobs(data, output_base, selection if selection and selection.active else None, write=False)
+    jobs = classify_jobs(jobs, None, config, load_providers(config), probe=False)
+    manifest = Manifest(output_base)
+
+    tasks = []
+    for idx, job in enumerate(jobs):
+        paths = artifact_paths(job)
+        entry = next((manifest.get(p) for p in paths if manifest.get(p)), None) or {}
+        expected = entry.get('size') or (job.get('size') if job['type'] == 'file' else None)
+        tasks.append((idx, paths, expected, entry.get('sha256'), checksum))
+
+    start = time.time()
+    counts, problems = {}, []
+    workers = workers or int(config.get("verify_workers", os.cpu_count() or 2))
+    flush_print(f"[VERIFY] {len(tasks)} artifacts on {workers} processes...")
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for idx, status, found, detail in pool.map(check_artifact, tasks, chunksize=16):
+            counts[status] = counts.get(status, 0) + 1
+            if status == "ok": continue
+            job = dict(jobs[idx], reason=status, redownload=status != "missing")
+            if found and job['type'] == 'file':
+                job['name'] = Path(found).name  # the name the downloader actually saved
+            if detail: job['detail'] = detail
+            problems.append(job)
+            flush_print(f"   [{status.upper()}] {job['folder']}/{job['name']}" + (f" ({detail})" if detail else ""))
+
+    report = {
+        "generated_at": int(time.time()),
+        "output_dir": str(output_base),
+        "checked": len(tasks),
+        "counts": counts,
+        "jobs": problems,
+    }
+    with open(output, "w", encoding="utf-8") as f: json.dump(report, f, indent=2)
+    summary = ", ".join(f"{k}={v}" for k, v in sorted(counts.items()))
+    flush_print(f"\n[FINISH] Verified {len(tasks)} artifacts in {time.time() - start:.1f}s ({summary}).")
+    if problems:
+        flush_print(f"   Re-download with: python tools/downloader.py --queue {output}")
+    return report
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Verify the download folder against map.json")
+    parser.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+    parser.add_argument("--no-checksum", action="store_true", help="skip sha256 comparison (presence, size and headers only)")
+    parser.add_argument("--output", default=str(QUEUE_FILE), help="queue file for the downloader")
+    add_filter_args(parser)
+    args = parser.parse_args()
+    report = verify(workers=args.workers, checksum=not args.no_checksum,
+                    selection=Selection(args.include, args.exclude), output=args.output)
+    sys.exit(1 if report and report["jobs"] else 0)